@@ -1,3 +1,8 @@
+import multiprocessing
+if __name__ == "__main__":
+    # Frozen conversion workers re-launch this executable; they hand over to image_convert
+    # here, before the Qt, logging, HTTP and cache setup below runs
+    multiprocessing.freeze_support()
 import socket
 import uuid
 from PySide6.QtWidgets import (
@@ -19,21 +24,23 @@ import os
 import platform
 import logging.handlers
 import requests
-from requests.exceptions import RequestException
 import urllib3
 import json
 from urllib.parse import urlparse, parse_qs, quote
 from pathlib import Path
 from datetime import datetime, timedelta, timezone 
 from zoneinfo import ZoneInfo
-from PIL import Image, ImageSequence
+from PIL import Image
 import subprocess
-from queue import Queue
+from queue import Empty, Queue, PriorityQueue
 import threading
 import time
 import re
 import io
 import hashlib
+import itertools
+import random
+import sqlite3
 import httpx
 import mimetypes
 from pid import PidFile, PidFileError
@@ -41,73 +48,27 @@ import warnings
 import tempfile
 import psutil  # To check if Photoshop is running
 from threading import Lock, Semaphore, Thread
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from collections import OrderedDict, deque
 
 from PySide6.QtGui import QPixmap
 from PySide6.QtWidgets import QLabel
 
 if platform.system() != "Windows":
     import fcntl
-import numpy as np
-try:
-    from psd_tools import PSDImage
-except ImportError:
-    PSDImage = None
-try:
-    import rawpy
-except ImportError:
-    rawpy = None
-try:
-    import tifffile
-except ImportError:
-    tifffile = None
+import image_convert
+from env_config import env_float, env_int
 import pytz
 import shutil
 
-try:
-    import imagecodecs
-except ImportError:
-    logger.warning("imagecodecs not installed, LZW-compressed TIFFs may not work")
 from httpx import Timeout
 if platform.system() == "Windows":
     import pythoncom
     import win32com.client
     import win32gui
     import win32con
-from scp import SCPClient
 
-# def fast_scp_upload(ssh_transport, src_path, dest_path):
-#     with SCPClient(ssh_transport, socket_timeout=30) as scp:
-#         scp.put(src_path, dest_path)
-
-
-def fast_scp_upload(src_path, dest_path):
-    cmd = [
-        "sshpass", "-p", NAS_PASSWORD,
-        "scp",
-        "-P", str(NAS_PORT),
-        "-o", "Compression=no",
-        "-o", "StrictHostKeyChecking=no",
-        str(src_path),
-        f"{NAS_USERNAME}@{NAS_IP}:{dest_path}"
-    ]
-
-    start = time.time()
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    duration = time.time() - start
-
-    if result.returncode != 0:
-        raise RuntimeError(result.stderr.strip())
-
-    size_mb = Path(src_path).stat().st_size / (1024 * 1024)
-    speed = size_mb / duration if duration else 0
-
-    print(f"⚡ SCP Uploaded {size_mb:.2f} MB in {duration:.2f}s ({speed:.2f} MB/s)")
-
-SUPPORTED_EXTENSIONS = [
-    "jpg", "jpeg", "png", "gif", "tiff", "tif", "bmp", "webp",
-    "psd", "psb", "cr2", "nef", "arw", "dng", "raf", "pef", "srw"
-]
 import shlex
 # Global stop queue for signaling
 FILE_WATCHER_STOP_QUEUE = Queue()
@@ -120,6 +81,12 @@ except ImportError as e:
     NAS_AVAILABLE = False
     paramiko = None
 
+try:
+    import h2  # noqa: F401 -- lets httpx negotiate HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 try:
     import traceback
 except ImportError as e:
@@ -254,9 +221,14 @@ def get_cache_file_path():
     return str(cache_file)
 
 CACHE_FILE = get_cache_file_path()
+CACHE_DB_FILE = str(Path(CACHE_FILE).with_name("cache.db"))
+CACHE_SNAPSHOT_FILE = str(Path(CACHE_FILE).with_name("cache.snapshot.json"))
 CACHE_DAYS = 10
+CACHE_FLUSH_DELAY = 5.0  # seconds routine cache changes wait before being written
+CACHE_COMPACT_INTERVAL = 600  # seconds between WAL checkpoints and JSON snapshots
 API_URL = f"{BASE_DOMAIN}/api/ir_production/get/projectList?business=image_retouching"
 DOWNLOAD_UPLOAD_API = f"{BASE_DOMAIN}/api/get_download_upload/submission"
+TASK_PUSH_API = f"{BASE_DOMAIN}/api/get_download_upload/events"
 OAUTH_URL = f"{BASE_DOMAIN}/oauth/token"
 USER_VALIDATE_URL = f"{BASE_DOMAIN}/api/user/validate"
 API_URL_CREATE = f"{BASE_DOMAIN}/api/nas_create/creative"
@@ -277,6 +249,32 @@ NAS_SHARE = ""
 NAS_PREFIX ='/mnt/nas/softwaremedia/IR_prod'
 NAS_USERNAME = "irnasappprod"
 MOUNTED_NAS_PATH ='/mnt/nas/softwaremedia/IR_prod'
+NAS_CIPHERS = ('aes128-ctr', 'aes192-ctr', 'aes256-ctr')
+NAS_POOL_MAX_IDLE = 4  # warm connections kept per process
+NAS_POOL_IDLE_TIMEOUT = 300  # seconds before an unused connection is closed
+NAS_KEEPALIVE_INTERVAL = 30  # seconds between SSH keepalive packets
+SFTP_MAX_REQUESTS = 64  # outstanding SFTP read requests per channel
+SFTP_PREFETCH_WINDOW = 8 * 1024 * 1024  # bytes requested ahead of the reader
+SFTP_BUFFER_SIZE = 1024 * 1024  # reusable local write buffer
+TRANSFER_PROGRESS_INTERVAL = 0.5  # seconds between progress signals per file
+TRANSFER_CHECKPOINT_BYTES = 8 * 1024 * 1024  # resume granularity for .part files
+SFTP_UPLOAD_BLOCK_SIZE = 4 * 1024 * 1024  # bytes handed to each pipelined SFTP write
+BANDWIDTH_BURST_SECONDS = 0.5  # seconds of throttled traffic that may go out in one burst
+BANDWIDTH_MIN_CHUNK = 256 * 1024  # smallest read window / write block used while throttled
+PARALLEL_TRANSFER_THRESHOLD = 1024 * 1024 * 1024  # files this large move over several streams
+PARALLEL_TRANSFER_STREAMS = 4  # default SFTP streams per large file
+TRANSFER_LARGE_FILE_THRESHOLD = 256 * 1024 * 1024  # files this large use the large-file lane
+TRANSFER_LARGE_EXTENSIONS = (".psb", ".tif", ".tiff")  # treated as large when the task has no size
+TRANSFER_SMALL_LANE_WORKERS = 4  # most transfers the small-file lane may run at once
+TRANSFER_LARGE_LANE_WORKERS = 2  # most transfers the large-file lane may run at once
+NAS_CONCURRENCY_INITIAL = 2  # concurrent NAS transfers before any throughput is measured
+NAS_CONCURRENCY_MIN = 1
+NAS_CONCURRENCY_DECREASE = 0.5  # multiplicative cut after a network failure
+NAS_CONCURRENCY_NO_GAIN_DECREASE = 0.75  # cut when the last step up did not raise throughput
+NAS_CONCURRENCY_MIN_GAIN = 0.1  # throughput gain an extra stream must bring to be kept
+NAS_CONCURRENCY_ADJUST_INTERVAL = 5  # seconds between limit changes
+NAS_CONCURRENCY_SAMPLE_TTL = 300  # seconds a throughput sample stays comparable
+TRANSFER_TYPE_PRIORITY = {"upload": 0, "replace": 0, "download": 1}  # finished work goes out first
 
 
 # NAS_IP = "192.168.3.20"
@@ -288,12 +286,53 @@ MOUNTED_NAS_PATH ='/mnt/nas/softwaremedia/IR_prod'
 # MOUNTED_NAS_PATH ='/mnt/nas/softwaremedia/IR_uat'
 
 APPVERSION = "1.1.4"
-API_POLL_INTERVAL = 5000  # 5 seconds in milliseconds
+API_POLL_INTERVAL = 3000  # fastest task poll while tasks are flowing (ms)
+API_POLL_INTERVAL_MAX = 60000  # slowest poll once idle or failing (ms)
+API_POLL_IDLE_BACKOFF = 1.5  # interval growth per empty task list
+API_POLL_ERROR_BACKOFF = 2.0  # interval growth per failed poll
+API_POLL_JITTER = 0.2  # +/- fraction applied to every scheduled poll
+REACHABILITY_FAILURE_THRESHOLD = 2  # failed task fetches before the circuit opens
+REACHABILITY_COOLDOWN = 5  # seconds the circuit stays open before the first probe
+REACHABILITY_MAX_COOLDOWN = 120  # cap on the probe backoff (seconds)
+PUSH_FALLBACK_POLL_INTERVAL = 300000  # safety-net poll while the push channel is up (ms)
+PUSH_READ_TIMEOUT = 90  # seconds without data or heartbeat before reconnecting
+PUSH_RECONNECT_MIN = 1  # seconds before the first reconnect attempt
+PUSH_RECONNECT_MAX = 60  # cap on the reconnect backoff (seconds)
+PUSH_UNSUPPORTED_RETRY = 900  # seconds before retrying a server without the push endpoint
+HTTP_MAX_CONNECTIONS = env_int("PREMEDIA_HTTP_MAX_CONNECTIONS", 20)  # pooled API connections in total
+HTTP_MAX_KEEPALIVE = env_int("PREMEDIA_HTTP_MAX_KEEPALIVE", 10)  # idle API connections kept open
+HTTP_KEEPALIVE_EXPIRY = 60  # seconds an idle API connection is kept
+HTTP_TIMEOUT = 30  # default API read/write/pool timeout (seconds)
+HTTP_CONNECT_TIMEOUT = 10  # API connect timeout (seconds)
+HTTP_CONNECT_RETRIES = 2  # transport-level retries of a failed connect
+HTTP_REQUEST_RETRIES = 2  # api_request retries after a transport error or gateway failure
+HTTP_RETRY_BACKOFF = 1  # seconds before the first api_request retry, doubled after each
+HTTP_RETRY_STATUSES = (502, 503, 504)
+STATUS_RETRY_MIN = 2  # seconds before resending a failed status update
+STATUS_RETRY_MAX = 120  # cap on the status update backoff (seconds)
+STATUS_FLUSH_TIMEOUT = 3  # seconds queued status updates get to go out on quit
 log_window_handler = None
 # === Global State ===
 GLOBAL_CACHE = None
-CACHE_WRITE_LOCK = threading.Lock()
-HTTP_SESSION = requests.Session()
+CACHE_WRITE_LOCK = threading.RLock()
+
+
+def create_http_client():
+    """Build the pooled keep-alive client every API call goes through.
+
+    HTTP/2 is used when ``h2`` is installed. Redirects are followed, as the
+    requests session this replaces did.
+    """
+    limits = httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                          keepalive_expiry=HTTP_KEEPALIVE_EXPIRY)
+    return httpx.Client(
+        transport=httpx.HTTPTransport(verify=False, http2=HTTP2_AVAILABLE, limits=limits, retries=HTTP_CONNECT_RETRIES),
+        timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        follow_redirects=True,
+    )
+
+
+HTTP_SESSION = create_http_client()
 FILE_WATCHER_RUNNING = False
 LOGGING_ACTIVE = True
 app_signals = None
@@ -323,6 +362,9 @@ except Exception as e:
     console_handler.setFormatter(formatter)
     logger.addHandler(console_handler)
 
+if image_convert.imagecodecs is None:
+    logger.warning("imagecodecs not installed, LZW-compressed TIFFs may not work")
+
 
 # === Signals for Safe GUI Updates ===
 class AppSignals(QObject):
@@ -561,6 +603,356 @@ def get_system_info():
         info["network"] = {"error": str(e)}
 
 
+# ===================== Cache store =====================
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS session (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    metadata_key TEXT NOT NULL,
+    task_key TEXT NOT NULL,
+    task_id TEXT,
+    spec_id TEXT,
+    local_path TEXT,
+    request_status TEXT,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (metadata_key, task_key)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_task_id ON tasks (task_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_spec_id ON tasks (spec_id);
+CREATE TABLE IF NOT EXISTS transfer_state (
+    direction TEXT NOT NULL,
+    remote_path TEXT NOT NULL,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (direction, remote_path)
+);
+CREATE TABLE IF NOT EXISTS transfer_queue (
+    task_key TEXT PRIMARY KEY,
+    task_id TEXT,
+    action_type TEXT,
+    state TEXT NOT NULL,
+    item TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transfer_queue_state ON transfer_queue (state);
+CREATE TABLE IF NOT EXISTS status_outbox (
+    task_id TEXT PRIMARY KEY,
+    request_status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Durable transfer queue states: queued -> transferring -> verifying -> done / failed
+TRANSFER_QUEUE_STATES = ("queued", "transferring", "verifying", "done", "failed")
+TRANSFER_QUEUE_UNFINISHED = ("queued", "transferring", "verifying")
+
+
+_MISSING = object()
+
+
+class CacheStore:
+    """SQLite (WAL) store behind load_cache/save_cache.
+
+    Top-level cache keys live in ``session``, each entry of the
+    ``*_files_with_metadata`` dicts is a row in ``tasks``, resumable
+    transfer checkpoints live in ``transfer_state``, the durable queue of
+    submitted transfers in ``transfer_queue`` and task status updates not yet
+    sent to the server in ``status_outbox``. ``save`` only writes the rows
+    whose JSON changed since they were last read or written.
+
+    The WAL is the change journal: every save is one fsync'd transaction
+    appended to it. ``compact`` folds the WAL back into the database and
+    writes an atomic JSON snapshot, which ``recover`` rebuilds from when
+    the database fails its integrity check.
+    """
+
+    TASK_KEYS = ("downloaded_files_with_metadata", "uploaded_files_with_metadata")
+
+    def __init__(self, path, legacy_json=None, snapshot_path=None):
+        self.path = path
+        self.legacy_json = legacy_json
+        self.snapshot_path = snapshot_path or f"{path}.snapshot.json"
+        self._lock = threading.RLock()
+        self._conn = None
+        self._written = {}
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=FULL")
+                conn.executescript(CACHE_SCHEMA)
+                if conn.execute("PRAGMA quick_check").fetchone()[0] != "ok":
+                    raise sqlite3.DatabaseError(f"{self.path} failed its integrity check")
+            except sqlite3.Error:
+                conn.close()
+                raise
+            self._conn = conn
+            self._written = {}
+            if self.legacy_json and os.path.exists(self.legacy_json):
+                # One-time import of the old cache.json, renamed afterwards so it is not re-read
+                self._import_json(self.legacy_json, rename_to=f"{self.legacy_json}.migrated")
+        return self._conn
+
+    def _import_json(self, json_path, rename_to=None):
+        try:
+            with open(json_path, "r") as f:
+                cache = json.load(f)
+            if isinstance(cache, dict):
+                self.save(cache)
+            if rename_to:
+                os.replace(json_path, rename_to)
+            logger.info(f"[Cache] Imported {json_path} into {self.path}")
+            return isinstance(cache, dict)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"[Cache] Could not import {json_path}: {e}")
+            return False
+
+    def recover(self):
+        """Quarantine a damaged database and rebuild it from the last snapshot.
+
+        Returns True when the snapshot could be restored.
+        """
+        with self._lock:
+            self.close()
+            suffix = f"corrupt-{int(time.time())}"
+            for db_file in (self.path, f"{self.path}-wal", f"{self.path}-shm"):
+                try:
+                    os.replace(db_file, f"{db_file}.{suffix}")
+                except FileNotFoundError:
+                    pass
+            logger.error(f"[Cache] Quarantined damaged cache store as {self.path}.{suffix}")
+            self._connect()
+            if not os.path.exists(self.snapshot_path):
+                return False
+            return self._import_json(self.snapshot_path)
+
+    def compact(self):
+        """Checkpoint the WAL into the database and write an fsync'd JSON snapshot."""
+        with self._lock:
+            conn = self._connect()
+            cache = self.load()
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(cache, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+
+    def is_empty(self):
+        with self._lock:
+            return self._connect().execute("SELECT 1 FROM session LIMIT 1").fetchone() is None
+
+    def load(self):
+        with self._lock:
+            conn = self._connect()
+            cache = {}
+            for key, value in conn.execute("SELECT key, value FROM session"):
+                self._written[("session", key)] = value
+                cache[key] = json.loads(value)
+            for metadata_key, task_key, data in conn.execute("SELECT metadata_key, task_key, data FROM tasks"):
+                self._written[("tasks", metadata_key, task_key)] = data
+                cache.setdefault(metadata_key, {})[task_key] = json.loads(data)
+            return cache
+
+    def _value(self, cache, row_key):
+        """Current value of one row of ``cache``, or _MISSING when it no longer exists."""
+        if row_key[0] == "session":
+            return cache.get(row_key[1], _MISSING)
+        tasks = cache.get(row_key[1])
+        return tasks.get(row_key[2], _MISSING) if isinstance(tasks, dict) else _MISSING
+
+    def save(self, cache, row_keys=None):
+        """Write changed rows of ``cache``; only ``row_keys`` are looked at when given."""
+        with self._lock:
+            conn = self._connect()
+            if row_keys is None:
+                rows = {}
+                for key, value in cache.items():
+                    if key in self.TASK_KEYS and isinstance(value, dict):
+                        for task_key, entry in value.items():
+                            rows[("tasks", key, str(task_key))] = entry
+                    else:
+                        rows[("session", key)] = value
+                for row_key in self._written:
+                    rows.setdefault(row_key, _MISSING)
+            else:
+                rows = {row_key: self._value(cache, row_key) for row_key in row_keys}
+            written = {}
+            now = time.time()
+            with conn:
+                for row_key, value in rows.items():
+                    if value is _MISSING:
+                        if row_key in self._written:
+                            if row_key[0] == "session":
+                                conn.execute("DELETE FROM session WHERE key = ?", (row_key[1],))
+                            else:
+                                conn.execute("DELETE FROM tasks WHERE metadata_key = ? AND task_key = ?", row_key[1:])
+                        written[row_key] = None
+                        continue
+                    data = json.dumps(value, sort_keys=True)
+                    written[row_key] = data
+                    if self._written.get(row_key) == data:
+                        continue
+                    if row_key[0] == "session":
+                        conn.execute("INSERT OR REPLACE INTO session (key, value) VALUES (?, ?)", (row_key[1], data))
+                    else:
+                        api_response = value.get("api_response") if isinstance(value, dict) else None
+                        if not isinstance(api_response, dict):
+                            api_response = {}
+                        conn.execute(
+                            "INSERT OR REPLACE INTO tasks (metadata_key, task_key, task_id, spec_id, local_path, "
+                            "request_status, data, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            (row_key[1], row_key[2], str(api_response.get("id", "")),
+                             str(api_response.get("spec_id", row_key[2])),
+                             value.get("local_path") if isinstance(value, dict) else None,
+                             api_response.get("request_status"), data, now)
+                        )
+            for row_key, data in written.items():
+                if data is None:
+                    self._written.pop(row_key, None)
+                else:
+                    self._written[row_key] = data
+
+    def reset(self, cache):
+        """Drop every session and task row and store ``cache`` in their place."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM session")
+                conn.execute("DELETE FROM tasks")
+            self._written = {}
+            self.save(cache)
+
+    def get_transfer_state(self, direction, remote_path):
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT state FROM transfer_state WHERE direction = ? AND remote_path = ?", (direction, remote_path)
+            ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def set_transfer_state(self, direction, remote_path, state):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO transfer_state (direction, remote_path, state, updated_at) VALUES (?, ?, ?, ?)",
+                    (direction, remote_path, json.dumps(state), time.time())
+                )
+
+    def clear_transfer_state(self, direction, remote_path):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM transfer_state WHERE direction = ? AND remote_path = ?", (direction, remote_path))
+
+    def set_queue_state(self, task_key, state, item=None, error=None):
+        """Move ``task_key`` to ``state`` in the transfer queue, adding it if missing.
+
+        ``item`` (the task as fetched) is kept from earlier calls when not given;
+        every move to "transferring" counts as one attempt.
+        """
+        if state not in TRANSFER_QUEUE_STATES:
+            raise ValueError(f"Unknown transfer queue state: {state}")
+        task_id, _, action_type = task_key.partition(":")
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT INTO transfer_queue (task_key, task_id, action_type, state, item, attempts, error, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (task_key) DO UPDATE SET state = excluded.state, "
+                    "item = COALESCE(excluded.item, transfer_queue.item), "
+                    "attempts = transfer_queue.attempts + excluded.attempts, "
+                    "error = excluded.error, updated_at = excluded.updated_at",
+                    (task_key, task_id, action_type, state, json.dumps(item) if item is not None else None,
+                     int(state == "transferring"), error, time.time())
+                )
+
+    def get_queue_entry(self, task_key):
+        entries = self._queue_entries("WHERE task_key = ?", (task_key,))
+        return entries[0] if entries else None
+
+    def queued_transfers(self, states=TRANSFER_QUEUE_UNFINISHED):
+        """Queue entries in any of ``states``, oldest first."""
+        placeholders = ", ".join("?" * len(states))
+        return self._queue_entries(f"WHERE state IN ({placeholders}) ORDER BY updated_at", tuple(states))
+
+    def _queue_entries(self, where, params):
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT task_key, task_id, action_type, state, item, attempts, error, updated_at "
+                f"FROM transfer_queue {where}", params
+            ).fetchall()
+        return [
+            {"task_key": task_key, "task_id": task_id, "action_type": action_type, "state": state,
+             "item": json.loads(item) if item else None, "attempts": attempts, "error": error,
+             "updated_at": updated_at}
+            for task_key, task_id, action_type, state, item, attempts, error, updated_at in rows
+        ]
+
+    def prune_transfer_queue(self, max_age):
+        """Forget done and failed entries last touched more than ``max_age`` seconds ago."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "DELETE FROM transfer_queue WHERE state IN ('done', 'failed') AND updated_at < ?",
+                    (time.time() - max_age,)
+                )
+
+    def put_status_update(self, task_id, request_status):
+        """Queue ``request_status`` for ``task_id``, replacing any update not yet sent."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO status_outbox (task_id, request_status, attempts, updated_at) "
+                    "VALUES (?, ?, 0, ?)", (str(task_id), request_status, time.time())
+                )
+
+    def pending_status_updates(self):
+        """Unsent ``(task_id, request_status, attempts, updated_at)`` rows, oldest first."""
+        with self._lock:
+            return self._connect().execute(
+                "SELECT task_id, request_status, attempts, updated_at FROM status_outbox ORDER BY updated_at"
+            ).fetchall()
+
+    def finish_status_update(self, task_id, updated_at, sent=True):
+        """Drop a sent (or abandoned) update, unless a newer one replaced it meanwhile.
+
+        With ``sent=False`` the row is kept and its attempt count bumped instead.
+        """
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                if sent:
+                    conn.execute("DELETE FROM status_outbox WHERE task_id = ? AND updated_at = ?", (task_id, updated_at))
+                else:
+                    conn.execute("UPDATE status_outbox SET attempts = attempts + 1 WHERE task_id = ? AND updated_at = ?",
+                                 (task_id, updated_at))
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._written = {}
+
+
+CACHE_STORE = CacheStore(CACHE_DB_FILE, legacy_json=CACHE_FILE, snapshot_path=CACHE_SNAPSHOT_FILE)
+
+
 def get_default_cache():
     """Return a fresh cache dictionary with created_at set once."""
     return {
@@ -576,41 +968,202 @@ def get_default_cache():
         "created_at": int(time.time())  # only when initialized
     }
 
+class CacheSnapshot(dict):
+    """Copy of GLOBAL_CACHE handed out by load_cache.
+
+    The top level and the task dicts are copied, so callers can iterate them
+    while other threads add tasks; the values and task entries are shared.
+    save_cache merges a snapshot back, writing only the keys and entries it
+    changed, so concurrent savers no longer drop each other's updates.
+    """
+
+    __slots__ = ("loaded", "loaded_tasks")
+
+
+class CacheFlusher:
+    """Writer of GLOBAL_CACHE changes into CACHE_STORE.
+
+    Significant changes are written through at once, so a crash loses at
+    most the change being written; routine ones are batched for
+    CACHE_FLUSH_DELAY seconds. Callers that know which rows they touched
+    pass them as ``row_keys``; otherwise the whole cache is diffed.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._timer = None
+        self._dirty = set()
+        self._full = False
+        self._last_compact = time.monotonic()
+
+    def mark(self, row_keys=None, significant_change=True):
+        with self._lock:
+            if row_keys is None:
+                self._full = True
+            else:
+                self._dirty.update(row_keys)
+            if not significant_change:
+                if self._timer is None:
+                    self._timer = threading.Timer(CACHE_FLUSH_DELAY, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+        self.flush()
+
+    def cancel(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = None
+            self._dirty = set()
+            self._full = False
+
+    def flush(self):
+        with CACHE_WRITE_LOCK:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                dirty, full = self._dirty, self._full
+                self._dirty, self._full = set(), False
+            if GLOBAL_CACHE is None or not (dirty or full):
+                return
+            try:
+                CACHE_STORE.save(GLOBAL_CACHE, None if full else dirty)
+                if time.monotonic() - self._last_compact >= CACHE_COMPACT_INTERVAL:
+                    CACHE_STORE.compact()
+                    self._last_compact = time.monotonic()
+            except (sqlite3.Error, OSError, TypeError, ValueError) as e:
+                print(f"[WARN] Could not save cache store: {e}")
+                with self._lock:
+                    self._full = True
+
+
+CACHE_FLUSHER = CacheFlusher()
+
+
+def _shared_cache():
+    """Return GLOBAL_CACHE, loading it from the store on first use. Call with CACHE_WRITE_LOCK held."""
+    global GLOBAL_CACHE
+    if GLOBAL_CACHE is None:
+        try:
+            if not CACHE_STORE.is_empty():
+                GLOBAL_CACHE = CACHE_STORE.load()
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            print(f"[WARN] Cache load failed ({e}), restoring from snapshot...")
+            logger.error(f"[Cache] Cache store load failed: {e}")
+            try:
+                if CACHE_STORE.recover():
+                    GLOBAL_CACHE = CACHE_STORE.load()
+            except (sqlite3.Error, json.JSONDecodeError) as e2:
+                print(f"[WARN] Cache restore failed ({e2}), recreating...")
+        if GLOBAL_CACHE is None:
+            initialize_cache()
+    # Ensure required keys exist (avoid KeyError later)
+    for key, default_value in get_default_cache().items():
+        if key not in GLOBAL_CACHE:
+            GLOBAL_CACHE[key] = default_value
+    return GLOBAL_CACHE
+
+def _snapshot(shared):
+    snapshot = CacheSnapshot(shared)
+    snapshot.loaded = dict(shared)
+    snapshot.loaded_tasks = {}
+    for key in CacheStore.TASK_KEYS:
+        if isinstance(shared.get(key), dict):
+            snapshot[key] = dict(shared[key])
+            snapshot.loaded_tasks[key] = dict(shared[key])
+    return snapshot
+
 def initialize_cache():
-    """Create a new cache file safely."""
+    """Reset the cache store to a fresh default cache."""
+    global GLOBAL_CACHE
     cache = get_default_cache()
-    try:
-        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
-        with open(CACHE_FILE, "w") as f:
-            json.dump(cache, f, indent=2)
-    except OSError as e:
-        print(f"[WARN] Could not initialize cache file: {e}")
-    return cache
+    with CACHE_WRITE_LOCK:
+        CACHE_FLUSHER.cancel()
+        try:
+            CACHE_STORE.reset(cache)
+        except sqlite3.Error as e:
+            print(f"[WARN] Could not initialize cache store: {e}")
+        GLOBAL_CACHE = cache
+        return _snapshot(cache)
 
 def load_cache():
-    """Load cache safely. If missing/corrupted, reinitialize."""
-    if os.path.exists(CACHE_FILE):
-        try:
-            with open(CACHE_FILE, "r") as f:
-                cache = json.load(f)
-            # Ensure required keys exist (avoid KeyError later)
-            for key, default_value in get_default_cache().items():
-                if key not in cache:
-                    cache[key] = default_value
-            return cache
-        except (json.JSONDecodeError, OSError) as e:
-            print(f"[WARN] Cache load failed ({e}), recreating...")
-            return initialize_cache()
-    else:
-        return initialize_cache()
+    """Return a snapshot of the in-memory cache, loading it from the store once."""
+    with CACHE_WRITE_LOCK:
+        return _snapshot(_shared_cache())
 
 def save_cache(cache, significant_change=True):
-    """Save cache safely without crashing app."""
+    """Merge ``cache`` into the in-memory cache and persist it.
+
+    Significant changes are written through, the rest are batched for
+    CACHE_FLUSH_DELAY. A plain dict (not a snapshot from load_cache)
+    replaces the whole cache, as writing the JSON file used to.
+    """
+    global GLOBAL_CACHE
+    with CACHE_WRITE_LOCK:
+        if not isinstance(cache, CacheSnapshot):
+            GLOBAL_CACHE = {key: dict(value) if key in CacheStore.TASK_KEYS and isinstance(value, dict) else value
+                            for key, value in cache.items()}
+        else:
+            shared = _shared_cache()
+            for key in cache.loaded.keys() - cache.keys():
+                shared.pop(key, None)
+            for key, value in cache.items():
+                if key in cache.loaded_tasks and isinstance(value, dict) and isinstance(shared.get(key), dict):
+                    loaded_tasks = cache.loaded_tasks[key]
+                    for task_key, entry in value.items():
+                        if loaded_tasks.get(task_key) is not entry:
+                            shared[key][task_key] = entry
+                elif key in CacheStore.TASK_KEYS and isinstance(value, dict):
+                    shared.setdefault(key, {}).update(value)
+                elif key not in cache.loaded or (cache.loaded[key] is not value and cache.loaded[key] != value):
+                    shared[key] = value
+    CACHE_FLUSHER.mark(significant_change=significant_change)
+
+def flush_cache():
+    """Write pending cache changes and a fresh snapshot now (on quit)."""
+    CACHE_FLUSHER.flush()
     try:
-        with open(CACHE_FILE, "w") as f:
-            json.dump(cache, f, indent=2)
-    except OSError as e:
-        print(f"[WARN] Could not save cache file: {e}")
+        CACHE_STORE.compact()
+    except (sqlite3.Error, OSError) as e:
+        print(f"[WARN] Could not compact cache store: {e}")
+
+def get_cached(key, default=None):
+    with CACHE_WRITE_LOCK:
+        return _shared_cache().get(key, default)
+
+def set_cached(key, value, significant_change=True):
+    with CACHE_WRITE_LOCK:
+        _shared_cache()[key] = value
+    CACHE_FLUSHER.mark([("session", key)], significant_change)
+
+def get_task_record(metadata_key, spec_id):
+    """Return a copy of a ``*_files_with_metadata`` entry, or None."""
+    with CACHE_WRITE_LOCK:
+        entry = _shared_cache().get(metadata_key, {}).get(str(spec_id))
+        return json.loads(json.dumps(entry)) if entry is not None else None
+
+def put_task_record(metadata_key, spec_id, entry, significant_change=True):
+    with CACHE_WRITE_LOCK:
+        _shared_cache().setdefault(metadata_key, {})[str(spec_id)] = entry
+    CACHE_FLUSHER.mark([("tasks", metadata_key, str(spec_id))], significant_change)
+
+def set_task_status(metadata_key, spec_id, request_status, significant_change=True, **fields):
+    """Set ``api_response.request_status`` (plus any top-level ``fields``) of a task entry.
+
+    Entries without an ``api_response`` get a plain ``status`` instead,
+    matching what the failure paths have always written.
+    """
+    with CACHE_WRITE_LOCK:
+        tasks = _shared_cache().setdefault(metadata_key, {})
+        entry = tasks.setdefault(str(spec_id), {})
+        entry.update(fields)
+        if isinstance(entry.get("api_response"), dict):
+            entry["api_response"]["request_status"] = request_status
+        else:
+            entry["status"] = request_status
+    CACHE_FLUSHER.mark([("tasks", metadata_key, str(spec_id))], significant_change)
 
 def get_cache_age(cache):
     """Get cache age in seconds."""
@@ -670,7 +1223,6 @@ def validate_user(access_key, status_bar=None):
             validation_url,
             params={"key": access_key, "machine_id": machine_id},
             # headers={"Authorization": f"Bearer {cache.get('token', '')}"},
-            verify=False,  # Replace with verify="/path/to/server-ca.pem" in production
             timeout=30
         )
         print(f"Request URL: {resp.url}")
@@ -726,7 +1278,6 @@ def start_timer_api(file_path, token):
             f"{BASE_DOMAIN}/api/ir_production/timer/start",
             json={"file_path": file_path},
             headers={"Authorization": f"Bearer {token}"},
-            verify=False,
             timeout=30
         )
         app_signals.api_call_status.emit(
@@ -748,7 +1299,6 @@ def end_timer_api(file_path, timer_response, token):
             f"{BASE_DOMAIN}/api/ir_production/timer/end",
             json={"file_path": file_path, "timer_response": timer_response},
             headers={"Authorization": f"Bearer {token}"},
-            verify=False,
             timeout=30
         )
         app_signals.api_call_status.emit(
@@ -830,30 +1380,94 @@ def check_nas_write_permission(sftp, nas_path):
 
 MAX_RETRIES = 10
 RETRY_BACKOFF = 2  # seconds
-TIMEOUT = 1000  # seconds
+RETRY_BACKOFF_MAX = 60  # cap on the upload retry delay (seconds)
+TIMEOUT = 1000  # seconds to wait for the server's answer once the body is sent
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # bytes read from disk per multipart body chunk
+UPLOAD_WRITE_TIMEOUT = 60  # seconds a single body chunk may take to send
+CONVERSION_WORKERS = env_int("PREMEDIA_CONVERSION_WORKERS", 0)  # 0 = one per physical core
+CONVERSION_JOBS_PER_WORKER = 25  # conversions before a worker process is replaced, to return its memory
 
 
-def call_api(api_url, payload, local_file_path=None):
-    logger.info("+++++++++++++++++++++++++++++++ Posting operator upload ++++++++++++++++++++++++++++++")
+class MultipartStream:
+    """multipart/form-data body that streams one file from disk.
+
+    Iterating yields the form fields, then the file in ``chunk_size`` pieces,
+    so the file is never held in memory and httpx sends the body with chunked
+    transfer encoding. ``callback(sent, total)`` is called after each file chunk.
+    """
+
+    def __init__(self, fields, file_field, file_path, callback=None, chunk_size=UPLOAD_CHUNK_SIZE):
+        self.fields = fields or {}
+        self.file_field = file_field
+        self.file_path = file_path
+        self.file_name = os.path.basename(file_path)
+        self.mime_type = mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+        self.callback = callback
+        self.chunk_size = chunk_size
+        self.total = os.path.getsize(file_path)
+        self.boundary = uuid.uuid4().hex
+
+    @property
+    def content_type(self):
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    @staticmethod
+    def _param(name, value):
+        value = str(value).replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+        return f'{name}="{value}"'
+
+    def _part_header(self, name, filename=None, content_type=None):
+        disposition = f"Content-Disposition: form-data; {self._param('name', name)}"
+        if filename is not None:
+            disposition += f"; {self._param('filename', filename)}"
+        header = f"--{self.boundary}\r\n{disposition}\r\n"
+        if content_type:
+            header += f"Content-Type: {content_type}\r\n"
+        return (header + "\r\n").encode()
+
+    def __iter__(self):
+        for name, value in self.fields.items():
+            for item in value if isinstance(value, (list, tuple)) else [value]:
+                data = item if isinstance(item, bytes) else ("" if item is None else str(item)).encode()
+                yield self._part_header(name) + data + b"\r\n"
+        yield self._part_header(self.file_field, self.file_name, self.mime_type)
+        sent = 0
+        with open(self.file_path, 'rb') as f:
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                sent += len(chunk)
+                yield chunk
+                if self.callback:
+                    self.callback(sent, self.total)
+        yield f"\r\n--{self.boundary}--\r\n".encode()
+
+
+def post_multipart(api_url, payload, file_field=None, local_file_path=None, callback=None):
+    """POST ``payload`` (plus one streamed file, if given) and return the JSON answer.
+
+    Transport errors are retried up to MAX_RETRIES times with capped
+    exponential backoff; each retry streams the file again from the start,
+    since the upload endpoints offer no resumable session. Errors are
+    returned as ``{"error": ...}`` dicts, as callers expect.
+    """
+    if local_file_path and not os.path.exists(local_file_path):
+        logger.error(f"File not found: {local_file_path}")
+        return {"error": "File not found"}
+    timeout = httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT, write=UPLOAD_WRITE_TIMEOUT, read=TIMEOUT)
     attempt = 0
     while attempt < MAX_RETRIES:
-        files = None
         try:
-            if local_file_path:
-                file_name = os.path.basename(local_file_path)
-                if not os.path.exists(local_file_path):
-                    logger.error(f"File not found: {local_file_path}")
-                    return {"error": "File not found"}
-                mime_type, _ = mimetypes.guess_type(local_file_path)
-                mime_type = mime_type or 'application/octet-stream'
-                files = {
-                    'creative_files': (file_name, open(local_file_path, 'rb'), mime_type)
-                }
-                logger.debug(f"File Name: {file_name}, MIME Type: {mime_type}, File Size: {os.path.getsize(local_file_path)} bytes")
             logger.debug(f"Payload being sent: {payload}")
-            logger.debug(f"Files being sent: {'Yes' if files else 'No'}")
-            with httpx.Client(timeout=TIMEOUT, verify=False) as client:
-                response = client.post(api_url, files=files, data=payload)
+            if local_file_path:
+                body = MultipartStream(payload, file_field, local_file_path, callback=callback)
+                logger.debug(f"File Name: {body.file_name}, MIME Type: {body.mime_type}, File Size: {body.total} bytes")
+                response = HTTP_SESSION.post(api_url, content=body, headers={"Content-Type": body.content_type},
+                                             timeout=timeout)
+            else:
+                logger.debug("Files being sent: No")
+                response = HTTP_SESSION.post(api_url, data=payload, timeout=timeout)
             logger.debug(f"Response Status Code: {response.status_code}")
             logger.debug(f"Response Text: {response.text[:500]}...")
             response.raise_for_status()
@@ -862,7 +1476,7 @@ def call_api(api_url, payload, local_file_path=None):
             logger.warning(f"[Attempt {attempt+1}] Request error: {req_err}")
             attempt += 1
             if attempt < MAX_RETRIES:
-                sleep_time = RETRY_BACKOFF ** attempt
+                sleep_time = min(RETRY_BACKOFF ** attempt, RETRY_BACKOFF_MAX)
                 logger.debug(f"Retrying after {sleep_time:.1f}s...")
                 time.sleep(sleep_time)
             else:
@@ -870,52 +1484,39 @@ def call_api(api_url, payload, local_file_path=None):
         except Exception as e:
             logger.error(f"Unexpected error: {e}")
             return {"error": "Unexpected error", "details": str(e)}
-        finally:
-            if files:
-                for _, file_obj, _ in files.values():
-                    file_obj.close()
 
-def call_api_qc_qa(api_url, payload, local_file_path=None):
+
+def call_api(api_url, payload, local_file_path=None, callback=None):
+    logger.info("+++++++++++++++++++++++++++++++ Posting operator upload ++++++++++++++++++++++++++++++")
+    return post_multipart(api_url, payload, 'creative_files', local_file_path, callback=callback)
+
+
+def call_api_qc_qa(api_url, payload, local_file_path=None, callback=None):
     logger.info("_____________________________ Posting Qc Qa Replace _______________________")
-    attempt = 0
-    while attempt < MAX_RETRIES:
-        files = None
+    return post_multipart(api_url, payload, 'files[]', local_file_path, callback=callback)
+
+
+def api_request(method, url, retries=HTTP_REQUEST_RETRIES, **kwargs):
+    """Send one API request over the shared client with the common retry policy.
+
+    Transport errors and gateway failures (HTTP_RETRY_STATUSES) are retried up
+    to ``retries`` times with exponential backoff; the last response is
+    returned and the last transport error re-raised. ``None`` values are
+    dropped from form ``data``, as requests did.
+    """
+    if isinstance(kwargs.get("data"), dict):
+        kwargs["data"] = {key: value for key, value in kwargs["data"].items() if value is not None}
+    for attempt in range(retries + 1):
         try:
-            if local_file_path:
-                file_name = os.path.basename(local_file_path)
-                if not os.path.exists(local_file_path):
-                    logger.error(f"File not found: {local_file_path}")
-                    return {"error": "File not found"}
-                mime_type, _ = mimetypes.guess_type(local_file_path)
-                mime_type = mime_type or 'application/octet-stream'
-                files = {
-                    'files[]': (file_name, open(local_file_path, 'rb'), mime_type)
-                }
-                logger.debug(f"File Name: {file_name}, MIME Type: {mime_type}, File Size: {os.path.getsize(local_file_path)} bytes")
-            logger.debug(f"Payload being sent: {payload}")
-            logger.debug(f"Files being sent: {'Yes' if files else 'No'}")
-            with httpx.Client(timeout=TIMEOUT, verify=False) as client:
-                response = client.post(api_url, files=files, data=payload)
-            logger.debug(f"Response Status Code: {response.status_code}")
-            logger.debug(f"Response Text: {response.text[:500]}...")
-            response.raise_for_status()
-            return response.json()
-        except httpx.RequestError as req_err:
-            logger.warning(f"[Attempt {attempt+1}] Request error: {req_err}")
-            attempt += 1
-            if attempt < MAX_RETRIES:
-                sleep_time = RETRY_BACKOFF ** attempt
-                logger.debug(f"Retrying after {sleep_time:.1f}s...")
-                time.sleep(sleep_time)
-            else:
-                return {"error": "Request failed", "details": str(req_err)}
-        except Exception as e:
-            logger.error(f"Unexpected error: {e}")
-            return {"error": "Unexpected error", "details": str(e)}
-        finally:
-            if files:
-                for _, file_obj, _ in files.values():
-                    file_obj.close()
+            response = HTTP_SESSION.request(method, url, **kwargs)
+            if response.status_code not in HTTP_RETRY_STATUSES or attempt == retries:
+                return response
+            logger.warning(f"[HTTP] {method} {url} answered {response.status_code} (attempt {attempt + 1})")
+        except httpx.TransportError as e:
+            if attempt == retries:
+                raise
+            logger.warning(f"[HTTP] {method} {url} failed (attempt {attempt + 1}): {e}")
+        time.sleep(HTTP_RETRY_BACKOFF * (2 ** attempt))
 
 
 def post_metadata_to_api_upload(spec_id, user_id):
@@ -927,7 +1528,20 @@ def post_metadata_to_api_upload(spec_id, user_id):
             'operator_uid': user_id,
             'spec_id': spec_id
         }
-        response = requests.post(API_URL_UPLOAD, json=payload, verify=False)
+        response = api_request("POST", API_URL_UPLOAD, json=payload)
+        logger.info(response)
+        if response.status_code == 200:
+            logger.info(f"Successfully posted metadata to API (Upload).")
+        else:
+            logger.error(f"Failed to post metadata to API (Upload): {response.status_code} {response.text}")
+    except Exception as e:
+        logger.error(f"Error posting metadata to API (Upload): {e}")
+
+
+def post_api(api_url,payload):
+    logger.info("-------------------------------------------------- Posting update -------------------------------")
+    try:        
+        response = api_request("POST", api_url, data=payload)
         logger.info(response)
         if response.status_code == 200:
             logger.info(f"Successfully posted metadata to API (Upload).")
@@ -937,56 +1551,682 @@ def post_metadata_to_api_upload(spec_id, user_id):
         logger.error(f"Error posting metadata to API (Upload): {e}")
 
 
-def post_api(api_url,payload):
-    logger.info("-------------------------------------------------- Posting update -------------------------------")
-    try:        
-        response = requests.post(api_url, data=payload, verify=False)
-        logger.info(response)
-        if response.status_code == 200:
-            logger.info(f"Successfully posted metadata to API (Upload).")
-        else:
-            logger.error(f"Failed to post metadata to API (Upload): {response.status_code} {response.text}")
-    except Exception as e:
-        logger.error(f"Error posting metadata to API (Upload): {e}")
+def send_status_update(task_id, request_status, timeout=10.0):
+    """POST one task status to the server; returns the response, raising on transport errors."""
+    payload = {"id": task_id, "request_status": request_status}
+    headers = {"Content-Type": "application/json"}
+    response = HTTP_SESSION.post(
+        API_URL_UPLOAD_DOWNLOAD_UPDATE,
+        content=json.dumps(payload),
+        headers=headers,
+        timeout=timeout,
+    )
+    print(f"================================================ Status Code {task_id} : {request_status}")
+    return response
+
+
+def update_download_upload_metadata(task_id, request_status):
+    """Queue a task status for the server without blocking the caller.
+
+    The update is stored in the outbox and sent by STATUS_REPORTER; a later
+    status for the same task replaces one that has not gone out yet.
+    """
+    try:
+        CACHE_STORE.put_status_update(task_id, request_status)
+    except sqlite3.Error as e:
+        logger.error(f"[Status] Could not queue status {request_status!r} for task {task_id}: {e}")
+        return
+    STATUS_REPORTER.wake()
+
+
+# ===================== Status reporter =====================
+
+class StatusReporter:
+    """Background sender for the task status outbox in the cache store.
+
+    Updates are coalesced per task by the outbox itself and sent oldest first
+    over the shared HTTP client (the API takes one task per call). A failed
+    send backs off exponentially, off the transfer threads; updates still
+    unsent at quit are picked up again on the next start. Client errors other
+    than 408/429 will not succeed on retry and are dropped.
+    """
+
+    def __init__(self, min_backoff=STATUS_RETRY_MIN, max_backoff=STATUS_RETRY_MAX):
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._idle = threading.Event()
+        self._thread = None
+        self._lock = Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = Thread(target=self._run, name="status-reporter", daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        with self._lock:
+            self._idle.clear()
+            self._wake.set()
+        self.start()
+
+    def stop(self, flush_timeout=STATUS_FLUSH_TIMEOUT):
+        """Give queued updates up to ``flush_timeout`` seconds to go out, then stop."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._idle.wait(flush_timeout)
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(flush_timeout)
+
+    def _run(self):
+        backoff = self.min_backoff
+        while not self._stop.is_set():
+            self._wake.clear()
+            if self._send_pending():
+                backoff = self.min_backoff
+                with self._lock:
+                    if not self._wake.is_set():
+                        self._idle.set()
+                self._wake.wait()
+            else:
+                self._wake.wait(backoff * random.uniform(0.8, 1.2))
+                backoff = min(backoff * 2, self.max_backoff)
+
+    def _send_pending(self):
+        """Send every queued update; False when one has to be retried later."""
+        try:
+            return self._send_outbox()
+        except sqlite3.Error as e:
+            logger.error(f"[Status] Could not use the status outbox: {e}")
+            return False
+
+    def _send_outbox(self):
+        all_sent = True
+        for task_id, request_status, attempts, updated_at in CACHE_STORE.pending_status_updates():
+            if self._stop.is_set():
+                return False
+            try:
+                response = send_status_update(task_id, request_status)
+            except httpx.HTTPError as e:
+                logger.warning(f"[Status] Sending {request_status!r} for task {task_id} failed (attempt {attempts + 1}): {e}")
+                CACHE_STORE.finish_status_update(task_id, updated_at, sent=False)
+                return False
+            if response.status_code == 200 or (400 <= response.status_code < 500 and response.status_code not in (408, 429)):
+                if response.status_code != 200:
+                    logger.error(f"[Status] Server rejected {request_status!r} for task {task_id}: {response.status_code}")
+                CACHE_STORE.finish_status_update(task_id, updated_at)
+                continue
+            # The server is up; one task failing should not hold back the others
+            logger.error(f"[Status] Sending {request_status!r} for task {task_id} failed with status {response.status_code}")
+            CACHE_STORE.finish_status_update(task_id, updated_at, sent=False)
+            all_sent = False
+        return all_sent
+
+
+STATUS_REPORTER = StatusReporter()
+
+# ===================== NAS connection pool =====================
+
+class NasConnection:
+    """An authenticated NAS transport together with its SFTP channel."""
+
+    def __init__(self):
+        if not NAS_AVAILABLE:
+            raise RuntimeError("NAS functionality disabled: paramiko not installed")
+        conn_start = time.time()
+        self.transport = paramiko.Transport((NAS_IP, NAS_PORT))
+        self.transport.get_security_options().ciphers = NAS_CIPHERS
+        try:
+            self.transport.connect(username=NAS_USERNAME, password=NAS_PASSWORD)
+            self.transport.set_keepalive(NAS_KEEPALIVE_INTERVAL)
+            self.sftp = paramiko.SFTPClient.from_transport(self.transport)
+        except Exception:
+            self.transport.close()
+            raise
+        self.created_at = self.last_used = time.time()
+        logger.info(f"[NAS Pool] Opened connection in {(self.last_used - conn_start) * 1000:.1f} ms")
+
+    def is_alive(self):
+        """Return True if the transport is up and the SFTP channel answers."""
+        if not self.transport.is_active() or self.sftp.sock.closed:
+            return False
+        # Keepalives cover the transport; only round-trip the channel when it sat idle
+        if time.time() - self.last_used > NAS_KEEPALIVE_INTERVAL:
+            try:
+                self.sftp.normalize(".")
+            except Exception:
+                return False
+        return True
+
+    def close(self):
+        for resource in (self.sftp, self.transport):
+            try:
+                resource.close()
+            except Exception:
+                pass
+
+
+class NasConnectionPool:
+    """Thread-safe pool of warm NAS connections shared by the transfer workers."""
+
+    def __init__(self, max_idle=NAS_POOL_MAX_IDLE, idle_timeout=NAS_POOL_IDLE_TIMEOUT):
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self._idle = []
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self):
+        """Check out a live connection, reusing a warm one when possible."""
+        self.evict_idle()
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                break
+            if conn.is_alive():
+                with self._lock:
+                    self.hits += 1
+                return conn
+            logger.info("[NAS Pool] Discarded dead connection")
+            conn.close()
+        with self._lock:
+            self.misses += 1
+        return NasConnection()
+
+    def release(self, conn, discard=False):
+        """Return a connection to the pool, closing it if broken or surplus."""
+        if discard or not conn.transport.is_active():
+            conn.close()
+            return
+        conn.last_used = time.time()
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Context manager yielding a pooled connection for one transfer."""
+        conn = self.acquire()
+        try:
+            yield conn
+        except Exception:
+            # A failed file operation leaves the channel usable; a failed link does not
+            self.release(conn, discard=not conn.transport.is_active())
+            raise
+        else:
+            self.release(conn)
+
+    def evict_idle(self):
+        now = time.time()
+        with self._lock:
+            expired = [c for c in self._idle if now - c.last_used > self.idle_timeout]
+            self._idle = [c for c in self._idle if c not in expired]
+        for conn in expired:
+            conn.close()
+        if expired:
+            logger.info(f"[NAS Pool] Evicted {len(expired)} idle connection(s)")
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return (self.hits / total) if total else 0.0
+
+    def stats(self):
+        with self._lock:
+            idle = len(self._idle)
+        return f"hits={self.hits} misses={self.misses} hit_rate={self.hit_rate:.0%} idle={idle}"
+
+
+NAS_CONNECTION_POOL = NasConnectionPool()
+
+# ===================== NAS transfer engine =====================
+
+class TransferProgress:
+    """Throttled byte-level progress reporter feeding the file list windows."""
+
+    def __init__(self, local_path, action_type, is_nas, interval=TRANSFER_PROGRESS_INTERVAL):
+        self.local_path = str(local_path)
+        self.action_type = action_type
+        self.is_nas = is_nas
+        self.interval = interval
+        self.started_at = time.time()
+        self._start_bytes = None
+        self._last_emit = 0.0
+        self._last_percent = -1
+
+    def __call__(self, transferred, total):
+        # Completion is reported by the task pipeline itself
+        if not total or transferred >= total:
+            return
+        if self._start_bytes is None:
+            # Resumed transfers start part-way; measure speed from here
+            self._start_bytes = transferred
+        now = time.time()
+        percent = int(transferred * 100 / total)
+        if percent == self._last_percent or now - self._last_emit < self.interval:
+            return
+        self._last_emit = now
+        self._last_percent = percent
+        elapsed = now - self.started_at
+        speed = (transferred - self._start_bytes) / (1024 * 1024) / elapsed if elapsed > 0 else 0
+        label = "Downloading" if self.action_type == "download" else "Uploading"
+        app_signals.update_file_list.emit(
+            self.local_path, f"{label} {percent}% ({speed:.1f} MB/s)", self.action_type, percent, self.is_nas
+        )
+
+
+class TransferCheckpoint:
+    """Record in the cache store of how far a resumable NAS transfer has got."""
+
+    def __init__(self, direction, remote_path):
+        self.direction = direction
+        self.remote_path = remote_path
+
+    def load(self):
+        try:
+            return CACHE_STORE.get_transfer_state(self.direction, self.remote_path)
+        except (sqlite3.Error, json.JSONDecodeError):
+            return {}
+
+    def save(self, **state):
+        CACHE_STORE.set_transfer_state(self.direction, self.remote_path, state)
+
+    def clear(self):
+        CACHE_STORE.clear_transfer_state(self.direction, self.remote_path)
+
+
+class TokenBucket:
+    """Byte-rate limiter shared by every transfer thread going one direction.
+
+    ``rate`` is in bytes per second, 0 meaning unlimited. ``schedule`` holds
+    ``(start, end, rate)`` windows of local time (``datetime.time``, wrapping
+    past midnight when ``end < start``) that override it. Callers reserve bytes
+    with ``consume`` before requesting or sending them; the bucket goes into
+    debt and the caller sleeps it off, so concurrent streams share the cap.
+    """
+
+    def __init__(self, name, rate=0, schedule=()):
+        self.name = name
+        self._lock = Lock()
+        self.configure(rate, schedule)
+
+    def configure(self, rate=0, schedule=()):
+        with self._lock:
+            self.base_rate = max(0, int(rate or 0))
+            self.schedule = list(schedule)
+            self._tokens = 0.0
+            self._stamp = time.monotonic()
+
+    def current_rate(self, now=None):
+        clock = (now or datetime.now()).time()
+        for start, end, rate in self.schedule:
+            if (start <= clock < end) if start <= end else (clock >= start or clock < end):
+                return rate
+        return self.base_rate
+
+    def chunk(self, size):
+        """Largest piece of ``size`` to reserve at once, so throttled traffic stays smooth."""
+        rate = self.current_rate()
+        if not rate:
+            return size
+        return max(min(size, BANDWIDTH_MIN_CHUNK), min(size, int(rate * BANDWIDTH_BURST_SECONDS)))
+
+    def consume(self, nbytes, abort=None):
+        """Block until ``nbytes`` may go over the wire at the current rate."""
+        rate = self.current_rate()
+        if not rate or nbytes <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            burst = rate * BANDWIDTH_BURST_SECONDS
+            self._tokens = min(burst, self._tokens + (now - self._stamp) * rate) - nbytes
+            self._stamp = now
+            wait = -self._tokens / rate if self._tokens < 0 else 0
+        if wait:
+            if abort is not None:
+                abort.wait(wait)
+            else:
+                time.sleep(wait)
+
+    def describe(self):
+        def rate_text(rate):
+            return f"{rate / 1024:.0f} KB/s" if rate else "unlimited"
+        windows = ", ".join(f"{start:%H:%M}-{end:%H:%M} {rate_text(rate)}" for start, end, rate in self.schedule)
+        return f"{self.name} {rate_text(self.base_rate)}" + (f" ({windows})" if windows else "")
+
+
+def parse_bandwidth_schedule(text):
+    """Parse a JSON list of ``{"start": "HH:MM", "end": "HH:MM", "upload": B/s, "download": B/s}``.
+
+    Returns ``{"upload": [...], "download": [...]}`` of ``(start, end, rate)``
+    windows; a window without a rate for a direction leaves that direction alone.
+    """
+    schedule = {"upload": [], "download": []}
+    if not text:
+        return schedule
+    try:
+        for window in json.loads(text):
+            start = datetime.strptime(window["start"], "%H:%M").time()
+            end = datetime.strptime(window["end"], "%H:%M").time()
+            for direction in schedule:
+                if window.get(direction) is not None:
+                    schedule[direction].append((start, end, max(0, int(window[direction]))))
+    except (ValueError, TypeError, KeyError) as e:
+        logger.warning(f"[Bandwidth] Ignoring invalid bandwidth schedule {text!r}: {e}")
+        return {"upload": [], "download": []}
+    return schedule
+
+
+UPLOAD_THROTTLE = TokenBucket("upload")
+DOWNLOAD_THROTTLE = TokenBucket("download")
+
+
+def sftp_download(sftp, remote_path, local_path, offset=0, callback=None, on_checkpoint=None,
+                  max_requests=SFTP_MAX_REQUESTS, window_size=SFTP_PREFETCH_WINDOW, buffer_size=SFTP_BUFFER_SIZE,
+                  throttle=DOWNLOAD_THROTTLE):
+    """Download a NAS file with pipelined SFTP reads, starting at ``offset``.
+
+    Up to ``max_requests`` reads are kept in flight for each prefetch window and
+    data is written through one reusable buffer. Each window is charged to
+    ``throttle`` before it is requested, and shrinks while a rate cap applies.
+    ``callback(transferred, total)`` is invoked after every buffer flush, and
+    ``on_checkpoint(offset)`` whenever another TRANSFER_CHECKPOINT_BYTES have
+    been synced to disk.
+    Returns the number of bytes written by this call.
+    """
+    total = sftp.stat(remote_path).st_size
+    transferred = last_checkpoint = offset
+    view = memoryview(bytearray(buffer_size))
+    with sftp.open(remote_path, "rb") as remote, open(local_path, "r+b" if offset else "wb") as local:
+        if offset:
+            local.truncate(offset)
+            local.seek(offset)
+            remote.seek(offset)
+        while transferred < total:
+            window_end = min(total, transferred + throttle.chunk(window_size))
+            throttle.consume(window_end - transferred)
+            remote.prefetch(window_end, max_concurrent_requests=max_requests)
+            while transferred < window_end:
+                count = remote.readinto(view[:min(buffer_size, window_end - transferred)])
+                if not count:
+                    raise IOError(f"Unexpected end of file at byte {transferred} of {remote_path}")
+                local.write(view[:count])
+                transferred += count
+                if callback:
+                    callback(transferred, total)
+            if on_checkpoint and transferred - last_checkpoint >= TRANSFER_CHECKPOINT_BYTES:
+                local.flush()
+                os.fsync(local.fileno())
+                on_checkpoint(transferred)
+                last_checkpoint = transferred
+    return transferred - offset
+
+
+def sftp_upload(sftp, local_path, remote_path, offset=0, callback=None, on_checkpoint=None,
+                block_size=SFTP_UPLOAD_BLOCK_SIZE, throttle=UPLOAD_THROTTLE):
+    """Upload a local file to the NAS with pipelined SFTP writes, starting at ``offset``.
+
+    Pipelined writes are not acknowledged one by one (and no other request may
+    be sent on the channel meanwhile), so ``on_checkpoint(offset)`` receives the
+    bytes sent and resume clamps it to the size the server reports. The final
+    size is checked after close. Every block is charged to ``throttle`` before
+    it is written. ``callback(transferred, total)`` is invoked after every
+    block. Returns the number of bytes sent.
+    """
+    total = os.path.getsize(local_path)
+    transferred = last_checkpoint = offset
+    with open(local_path, "rb") as local, sftp.open(remote_path, "r+b" if offset else "wb") as remote:
+        if offset:
+            remote.truncate(offset)
+            remote.seek(offset)
+            local.seek(offset)
+        remote.set_pipelined(True)
+        view = memoryview(bytearray(block_size))
+        while True:
+            count = local.readinto(view[:throttle.chunk(block_size)])
+            if not count:
+                break
+            throttle.consume(count)
+            remote.write(view[:count])
+            transferred += count
+            if callback:
+                callback(transferred, total)
+            if on_checkpoint and transferred - last_checkpoint >= TRANSFER_CHECKPOINT_BYTES:
+                on_checkpoint(transferred)
+                last_checkpoint = transferred
+    remote_size = sftp.stat(remote_path).st_size
+    if remote_size != total:
+        raise IOError(f"Size mismatch after upload of {local_path}: {remote_size} != {total}")
+    return transferred - offset
+
+
+def resumable_download(sftp, remote_path, local_path, callback=None):
+    """Download via ``<local_path>.part``, continuing from the last checkpoint.
+
+    The partial file is only kept when the remote size and mtime still match
+    the checkpoint; it is renamed into place once complete.
+    """
+    part_path = f"{local_path}.part"
+    checkpoint = TransferCheckpoint("download", remote_path)
+    remote_stat = sftp.stat(remote_path)
+    state = checkpoint.load()
+    offset = 0
+    if (os.path.exists(part_path) and state.get("remote_size") == remote_stat.st_size
+            and state.get("remote_mtime") == remote_stat.st_mtime):
+        offset = min(state.get("offset", 0), os.path.getsize(part_path))
+    if offset:
+        logger.info(f"[Transfer] Resuming download of {remote_path} at byte {offset}")
+        app_signals.append_log.emit(f"[Transfer] Resuming download of {remote_path} at byte {offset}")
+
+    def save_offset(verified_offset):
+        checkpoint.save(remote_path=remote_path, part_path=part_path, remote_size=remote_stat.st_size,
+                        remote_mtime=remote_stat.st_mtime, offset=verified_offset)
+
+    save_offset(offset)
+    transferred = sftp_download(sftp, remote_path, part_path, offset=offset, callback=callback, on_checkpoint=save_offset)
+    os.replace(part_path, local_path)
+    checkpoint.clear()
+    return transferred
+
+
+def resumable_upload(sftp, local_path, remote_path, callback=None, block_size=SFTP_UPLOAD_BLOCK_SIZE):
+    """Upload via ``<remote_path>.part`` on the NAS, continuing from the last checkpoint.
+
+    The remote partial file is only reused when the local size and mtime still
+    match the checkpoint; it is renamed over ``remote_path`` once complete.
+    """
+    part_path = f"{remote_path}.part"
+    checkpoint = TransferCheckpoint("upload", remote_path)
+    local_stat = os.stat(local_path)
+    state = checkpoint.load()
+    offset = 0
+    if state.get("local_size") == local_stat.st_size and state.get("local_mtime") == local_stat.st_mtime:
+        try:
+            offset = min(state.get("offset", 0), sftp.stat(part_path).st_size)
+        except FileNotFoundError:
+            offset = 0
+    if offset:
+        logger.info(f"[Transfer] Resuming upload of {local_path} at byte {offset}")
+        app_signals.append_log.emit(f"[Transfer] Resuming upload of {local_path} at byte {offset}")
+
+    def save_offset(verified_offset):
+        checkpoint.save(local_path=str(local_path), part_path=part_path, local_size=local_stat.st_size,
+                        local_mtime=local_stat.st_mtime, offset=verified_offset)
 
+    save_offset(offset)
+    transferred = sftp_upload(sftp, local_path, part_path, offset=offset, callback=callback,
+                              on_checkpoint=save_offset, block_size=block_size)
+    replace_remote(sftp, part_path, remote_path)
+    checkpoint.clear()
+    return transferred
 
-def update_download_upload_metadata(task_id, request_status, retries=3, timeout=10.0, base_retry_delay=2):
-   
-    payload = {"id": task_id, "request_status": request_status}
-    headers = {"Content-Type": "application/json"}
 
-    for attempt in range(1, retries + 1):
+def replace_remote(sftp, part_path, remote_path):
+    """Rename a finished ``.part`` upload over ``remote_path`` on the NAS."""
+    try:
+        sftp.posix_rename(part_path, remote_path)
+    except IOError:
+        # Server without the posix-rename extension: plain rename refuses to overwrite
         try:
-            response = httpx.post(
-                API_URL_UPLOAD_DOWNLOAD_UPDATE,
-                data=json.dumps(payload),
-                headers=headers,
-                verify=False,
-                timeout=timeout,
-            )
-            print(f"================================================ Status Code {task_id} : {request_status}")
-            if response.status_code == 200:
-                return response.json()
+            sftp.remove(remote_path)
+        except FileNotFoundError:
+            pass
+        sftp.rename(part_path, remote_path)
+
+
+def split_ranges(total, streams):
+    """Split ``total`` bytes into at most ``streams`` contiguous ``(start, end)`` ranges."""
+    size = max(1, -(-total // max(1, streams)))
+    return [(start, min(total, start + size)) for start in range(0, total, size)]
+
+
+def _download_range(pool, remote_path, part_path, start, end, on_bytes, abort):
+    """Fetch ``[start, end)`` of a NAS file into the same offsets of ``part_path``."""
+    view = memoryview(bytearray(SFTP_BUFFER_SIZE))
+    with pool.connection() as conn:
+        with conn.sftp.open(remote_path, "rb") as remote, open(part_path, "r+b") as local:
+            remote.seek(start)
+            local.seek(start)
+            position = start
+            while position < end:
+                window_end = min(end, position + DOWNLOAD_THROTTLE.chunk(SFTP_PREFETCH_WINDOW))
+                DOWNLOAD_THROTTLE.consume(window_end - position, abort)
+                remote.prefetch(window_end, max_concurrent_requests=SFTP_MAX_REQUESTS)
+                while position < window_end:
+                    if abort.is_set():
+                        raise IOError(f"Range {start}-{end} of {remote_path} aborted")
+                    count = remote.readinto(view[:min(len(view), window_end - position)])
+                    if not count:
+                        raise IOError(f"Unexpected end of file at byte {position} of {remote_path}")
+                    local.write(view[:count])
+                    position += count
+                    on_bytes(count)
+
+
+def _upload_range(pool, local_path, part_path, start, end, on_bytes, abort, block_size):
+    """Write ``[start, end)`` of a local file into the same offsets of the remote ``part_path``.
+
+    Every block but the very last byte goes out pipelined; that byte is written
+    synchronously, which drains and checks the status of every outstanding write.
+    """
+    view = memoryview(bytearray(block_size))
+    with pool.connection() as conn:
+        with open(local_path, "rb") as local, conn.sftp.open(part_path, "r+b") as remote:
+            local.seek(start)
+            remote.seek(start)
+            remote.set_pipelined(True)
+            position = start
+            while position < end:
+                if abort.is_set():
+                    raise IOError(f"Range {start}-{end} of {local_path} aborted")
+                count = local.readinto(view[:min(UPLOAD_THROTTLE.chunk(block_size), end - position)])
+                if not count:
+                    raise IOError(f"Unexpected end of file at byte {position} of {local_path}")
+                UPLOAD_THROTTLE.consume(count, abort)
+                if position + count < end:
+                    remote.write(view[:count])
+                else:
+                    if count > 1:
+                        remote.write(view[:count - 1])
+                    remote.set_pipelined(False)
+                    remote.write(view[count - 1:count])
+                position += count
+                on_bytes(count)
+
+
+def _run_ranges(ranges, worker, total, callback):
+    """Run ``worker(start, end, on_bytes, abort)`` for every range on its own thread."""
+    lock = Lock()
+    done = [0]
+    abort = threading.Event()
+
+    def on_bytes(count):
+        with lock:
+            done[0] += count
+            if callback:
+                callback(done[0], total)
+
+    with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix="nas-stream") as executor:
+        futures = [executor.submit(worker, start, end, on_bytes, abort) for start, end in ranges]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except Exception:
+            # Stop the sibling streams before the executor waits on them
+            abort.set()
+            raise
+    return done[0]
 
-            logger.error(
-                f"Attempt {attempt}: Failed with status {response.status_code}"
-            )
 
-        except (httpx.RequestError, httpx.HTTPStatusError) as e:
-            logger.error(f"Attempt {attempt}: Request error -> {e}")
-        except Exception as e:
-            logger.error(f"Attempt {attempt}: Unexpected error -> {e}")
+def parallel_download(pool, remote_path, local_path, total, streams, callback=None):
+    """Download a large NAS file as ``streams`` byte ranges over separate pooled connections.
+
+    Ranges are written at their offsets into ``<local_path>.part``, which is
+    renamed into place once every range has landed. A failed transfer starts
+    over on retry; per-range progress is not checkpointed.
+    """
+    part_path = f"{local_path}.part"
+    ranges = split_ranges(total, streams)
+    # Any single-stream checkpoint no longer describes the .part file
+    TransferCheckpoint("download", remote_path).clear()
+    with open(part_path, "wb") as local:
+        local.truncate(total)
+    logger.info(f"[Transfer] Downloading {remote_path} over {len(ranges)} streams")
+    app_signals.append_log.emit(f"[Transfer] Downloading {remote_path} over {len(ranges)} streams")
+    transferred = _run_ranges(
+        ranges,
+        lambda start, end, on_bytes, abort: _download_range(
+            pool, remote_path, part_path, start, end, on_bytes, abort),
+        total, callback
+    )
+    os.replace(part_path, local_path)
+    return transferred
 
-        if attempt < retries:
-            delay = base_retry_delay * (2 ** (attempt - 1))  # exponential backoff
-            time.sleep(delay)
 
-    return {"error": "Failed after retries"}
+def parallel_upload(pool, local_path, remote_path, streams, callback=None, block_size=SFTP_UPLOAD_BLOCK_SIZE):
+    """Upload a large local file as ``streams`` byte ranges over separate pooled connections.
 
-# ===================== image convertion logic =====================
+    Ranges are written at their offsets into the remote ``<remote_path>.part``,
+    whose size is checked before it is renamed over ``remote_path``. A failed
+    transfer starts over on retry; per-range progress is not checkpointed.
+    """
+    part_path = f"{remote_path}.part"
+    total = os.path.getsize(local_path)
+    ranges = split_ranges(total, streams)
+    TransferCheckpoint("upload", remote_path).clear()
+    with pool.connection() as conn:
+        conn.sftp.open(part_path, "wb").close()
+    logger.info(f"[Transfer] Uploading {local_path} over {len(ranges)} streams")
+    app_signals.append_log.emit(f"[Transfer] Uploading {local_path} over {len(ranges)} streams")
+    transferred = _run_ranges(
+        ranges,
+        lambda start, end, on_bytes, abort: _upload_range(
+            pool, local_path, part_path, start, end, on_bytes, abort, block_size),
+        total, callback
+    )
+    with pool.connection() as conn:
+        remote_size = conn.sftp.stat(part_path).st_size
+        if remote_size != total:
+            raise IOError(f"Size mismatch after upload of {local_path}: {remote_size} != {total}")
+        replace_remote(conn.sftp, part_path, remote_path)
+    return transferred
 
-def sanitize_filename(filename):
-    return re.sub(r'[^\w\-.]', '_', filename)
+# ===================== image convertion logic =====================
 
 def get_file_hash(file_path):
     """Calculate SHA256 hash of a file for integrity check."""
@@ -1051,159 +2291,134 @@ def check_nas_write_permission(sftp, nas_path):
         return False
 
 
+class ConversionService:
+    """Runs image_convert.process_single_file in a pool of worker processes.
+
+    Decoders (PSD composites, rawpy, tifffile) hold the GIL for long
+    stretches, so they run in separate processes, one per physical core by
+    default, started with "spawn" (forking a Qt process is not safe). Jobs
+    wait in an internal queue and at most ``workers`` run at a time. After
+    ``workers * jobs_per_worker`` jobs the pool is retired: it drains, is shut
+    down, and only then a fresh one starts, giving memory back without two
+    pools ever running side by side (``max_tasks_per_child`` is avoided as it
+    deadlocks on Python 3.11). Workers run image_convert.convert_file_job and
+    so import only that module. ``submit`` returns a Future resolving to
+    process_single_file's ``(jpg_path, original_path)``; ``cancel`` drops
+    jobs that have not started, while a running conversion is left to finish.
+    """
 
-
-
-
-
-def process_image_in_memory(image_data, ext, full_file_path):
-   
-    stream = io.BytesIO(image_data)
-    pil_image = None
-    ext = ext.lower()
-    logger.info(f"Starting processing of {full_file_path} with extension {ext}")
-
-    if ext in ['jpg', 'jpeg', 'png']:
-        pil_image = Image.open(stream)
-        logger.info(f"Opened {ext} file, mode: {pil_image.mode}")
-    elif ext == 'gif':
-        pil_image = Image.open(stream)
-        pil_image = next(ImageSequence.Iterator(pil_image))
-        logger.info("Processed GIF first frame, mode: {pil_image.mode}")
-    elif ext in ['tif', 'tiff']:
-        with tifffile.TiffFile(stream) as tif:
-            page = tif.pages[0]
-            arr = page.asarray()
-            photometric = getattr(page.photometric, 'name', 'unknown').lower()
-            if photometric in ['rgb', 'ycbcr']:
-                arr = arr[:, :, :3] if arr.ndim == 3 and arr.shape[2] >= 3 else arr
-                pil_image = Image.fromarray(arr.astype(np.uint8), mode='RGB')
-            elif photometric == 'cmyk':
-                pil_image = Image.fromarray(arr.astype(np.uint8), mode='CMYK').convert("RGB")
-            elif photometric == 'minisblack' or arr.ndim == 2:
-                arr = np.stack((arr,) * 3, axis=-1)
-                pil_image = Image.fromarray(arr.astype(np.uint8), mode='RGB')
-            else:
-                logger.warning(f"Unsupported TIFF photometric: {photometric}")
-                return None
-            logger.info(f"Processed TIFF, mode: {pil_image.mode}, photometric: {photometric}")
-    elif ext in ['psd', 'psb']:
-            psd = PSDImage.open(stream)
-            if psd is None or not psd.has_preview():
-                logger.error(f"PSD preview not available for {full_file_path}")
-                return None
-
-            pil_image = psd.composite()
-            logger.info(f"PSD composite result, mode: {pil_image.mode}, size: {pil_image.size}")
-
-            # Apply ICC profile if available
+    def __init__(self, workers=CONVERSION_WORKERS, jobs_per_worker=CONVERSION_JOBS_PER_WORKER):
+        self.workers = workers or psutil.cpu_count(logical=False) or os.cpu_count() or 1
+        self.jobs_per_worker = jobs_per_worker
+        self._executor = None
+        self._retiring = None  # drained executor whose processes are still exiting
+        self._submitted = 0  # jobs sent to the current executor
+        self._running = 0  # jobs on the executor that have not finished
+        self._queue = deque()  # (future, path, job_type) not yet handed to the executor
+        self._pending = set()
+        self._closed = False
+        self._lock = Lock()
+
+    def _dispatch(self):
+        """Hand queued jobs to the executor while fewer than ``workers`` run; call with the lock held.
+
+        Returns (future, executor_future) pairs; the caller links them once
+        the lock is released, as a finished job's callback runs inline.
+        """
+        started = []
+        while self._queue and self._running < self.workers and self._retiring is None and not self._closed:
+            if self._executor is not None and self._submitted >= self.workers * self.jobs_per_worker:
+                if self._running:
+                    break  # the retired pool drains before a fresh one starts
+                # Joining its processes here could be on the pool's own callback thread
+                self._retiring, self._executor = self._executor, None
+                Thread(target=self._retire, daemon=True).start()
+                break
+            future, path, job_type = self._queue.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+                self._submitted = 0
+                logger.info(f"[Conversion] Started {self.workers} worker process(es)")
             try:
-                icc = psd.image_resources.get("icc_profile")
-                if icc:
-                    pil_image.info["icc_profile"] = icc.data
-                    logger.info(f"Applied ICC profile to PSD: {full_file_path}")
-            except Exception as e:
-                logger.warning(f"Error extracting ICC profile: {e}")
-    elif ext in ['cr2', 'nef', 'arw', 'dng', 'raf', 'pef', 'srw']:
-        with rawpy.imread(stream) as raw:
-            rgb = raw.postprocess()
-            pil_image = Image.fromarray(rgb)
-        logger.info(f"Processed raw image, mode: {pil_image.mode}")
-    else:
-        pil_image = Image.open(stream)
-        logger.info(f"Opened {ext} file, mode: {pil_image.mode}")
-
-    if pil_image is None:
-        logger.error(f"Failed to create PIL image for {full_file_path}")
-        return None
-
-    if pil_image.mode != "RGB":
-        pil_image = pil_image.convert("RGB")
-        logger.info("Final conversion to RGB, size: {pil_image.size}")
-
-    jpeg_buffer = io.BytesIO()
-    logger.info(f"Attempting to save JPEG to buffer, initial position: {jpeg_buffer.tell()}")
-    pil_image.save(jpeg_buffer, format="JPEG", quality=80, icc_profile=pil_image.info.get('icc_profile'))
-    logger.info(f"JPEG save completed, buffer position: {jpeg_buffer.tell()}")
-    jpeg_buffer.seek(0)
-    buffer_size = jpeg_buffer.getbuffer().nbytes
-    logger.info(f"Buffer byte count: {buffer_size}")
-    if buffer_size == 0:
-        logger.error(f"Empty JPEG buffer for {full_file_path} after save")
-        return None
-    jpeg_buffer.seek(0)
-    return jpeg_buffer
- 
-
-
-
-
-
-
-def process_single_file(full_file_path):
-    """Convert a single file to JPEG and move original to backup."""
-    path = Path(full_file_path)
-    if not path.is_file():
-        logger.error(f"File does not exist: {full_file_path}")
-        return None, None
-
-    base_directory = path.parent
-    original_file_name = path.name
-    file_name = sanitize_filename(original_file_name)
-    ext = path.suffix.lower().lstrip(".")
-
-    if ext not in SUPPORTED_EXTENSIONS:
-        logger.debug(f"Unsupported file extension: {ext}")
-        error_dir = base_directory / "invalid_files"
-        error_dir.mkdir(exist_ok=True)
-        error_path = error_dir / original_file_name
-        path.rename(error_path)
-        logger.warning(f"File moved to invalid folder: {error_path}")
-        return None, None
-
-    output_file_name = ".".join(file_name.split(".")[:-1]) + ".jpg"
-    local_output_path = base_directory / output_file_name
-
-    if local_output_path.exists():
-        logger.info(f"Skipping: Output JPEG exists: {local_output_path}")
-        return str(local_output_path), str(path)
+                job = self._executor.submit(image_convert.convert_file_job, path, job_type)
+            except Exception as e:  # BrokenProcessPool: replace the pool for the next job
+                future.set_exception(e)
+                self._executor = None
+                continue
+            self._submitted += 1
+            self._running += 1
+            started.append((future, job))
+        return started
+
+    def _retire(self):
+        self._retiring.shutdown(wait=True)
+        with self._lock:
+            self._retiring = None
+            started = self._dispatch()
+        self._link(started)
 
-    if ext in ["jpg", "jpeg"]:
-        sanitized_path = base_directory / file_name
-        if path != sanitized_path:
-            path.rename(sanitized_path)
-        logger.debug(f"JPEG moved/renamed to {sanitized_path}")
-        return str(sanitized_path), str(sanitized_path)
+    def _link(self, started):
+        for future, job in started:
+            job.add_done_callback(lambda job, future=future: self._job_done(future, job))
 
-    with open(path, "rb") as f:
-        image_data = f.read()
+    def _job_done(self, future, job):
+        with self._lock:
+            self._running -= 1
+            started = self._dispatch()
+        if job.cancelled():
+            future.set_exception(CancelledError())
+        elif job.exception() is not None:
+            future.set_exception(job.exception())
+        else:
+            future.set_result(job.result())
+        self._link(started)
 
-    start_time = time.time()
-    jpeg_buffer = process_image_in_memory(image_data, ext, str(path))
-    elapsed = time.time() - start_time
-    logger.info(f"Conversion time: {elapsed:.2f} seconds")
+    def submit(self, full_file_path, job_type="preview"):
+        future = Future()
+        future.add_done_callback(self._forget)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("ConversionService is shut down")
+            self._pending.add(future)
+            self._queue.append((future, str(full_file_path), job_type))
+            started = self._dispatch()
+        self._link(started)
+        return future
+
+    def submit_many(self, paths, job_type="preview"):
+        return [self.submit(path, job_type) for path in paths]
+
+    def _forget(self, future):
+        with self._lock:
+            self._pending.discard(future)
 
-    if jpeg_buffer is None:
-        error_dir = base_directory / "invalid_files"
-        error_dir.mkdir(exist_ok=True)
-        error_path = error_dir / original_file_name
-        path.rename(error_path)
-        logger.warning(f"File moved to invalid folder: {error_path}")
-        return None, None
+    def cancel(self, future):
+        """Cancel a job that has not started yet; returns False if it is already running or done."""
+        return future.cancel()
 
-    if local_output_path.exists():
-        local_output_path.unlink()
+    def cancel_all(self):
+        with self._lock:
+            pending = list(self._pending)
+        cancelled = sum(1 for future in pending if future.cancel())
+        logger.info(f"[Conversion] Cancelled {cancelled} queued conversion(s)")
+        return cancelled
 
-    with open(local_output_path, "wb") as f:
-        f.write(jpeg_buffer.getvalue())
-    os.chmod(local_output_path, 0o777)
-    logger.debug(f"Converted JPEG written to {local_output_path}")
+    def shutdown(self, wait=False):
+        """Cancel every queued job and stop the pool; running conversions finish only if ``wait``."""
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+            pending = list(self._pending)
+            self._queue.clear()
+        for future in pending:
+            future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
 
-    backup_path = base_directory / original_file_name
-    path.rename(backup_path)
-    logger.debug(f"Original file renamed to {backup_path}")
 
-    return str(local_output_path), str(full_file_path)
+CONVERSION_SERVICE = ConversionService()
 
 
 # ===================== image covertion logic =====================
@@ -1256,7 +2471,6 @@ class FileConversionWorker(QObject):
                     f"{BASE_DOMAIN}/api/ir_production/upload/jpg",
                     files={'file': f},
                     headers={"Authorization": f"Bearer {cache.get('token', '')}"},
-                    verify=False,
                     timeout=30
                 )
                 app_signals.api_call_status.emit(
@@ -1273,6 +2487,406 @@ class FileConversionWorker(QObject):
             self.error.emit(str(e), Path(self.src_path).name)
 
 
+# ===================== Task push channel =====================
+
+class TaskPushClient:
+    """Server-sent events listener for new download/upload tasks.
+
+    Runs in a daemon thread and calls ``on_event(event, data)`` for every
+    event the server sends; ``on_state(connected)`` reports when the stream
+    comes up or drops so the caller can fall back to polling. Reconnects
+    with exponential backoff and jitter. ``params_factory`` returns the
+    query params and headers for the next connection, or None while the
+    user is not logged in.
+    """
+
+    def __init__(self, url, params_factory, on_event, on_state=None):
+        self.url = url
+        self.params_factory = params_factory
+        self.on_event = on_event
+        self.on_state = on_state
+        self.connected = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="task-push", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._set_connected(False)
+
+    def _set_connected(self, connected):
+        if connected != self.connected:
+            self.connected = connected
+            if self.on_state:
+                self.on_state(connected)
+
+    def _run(self):
+        delay = PUSH_RECONNECT_MIN
+        while not self._stop.is_set():
+            request = self.params_factory()
+            if request is None:
+                self._stop.wait(PUSH_RECONNECT_MAX)
+                continue
+            params, headers = request
+            try:
+                timeout = httpx.Timeout(10.0, read=PUSH_READ_TIMEOUT)
+                with HTTP_SESSION.stream("GET", self.url, params=params, timeout=timeout,
+                                         headers={**headers, "Accept": "text/event-stream"}) as response:
+                    if response.status_code in (404, 405, 501):
+                        logger.info(f"[Push] {self.url} not available ({response.status_code}), polling only")
+                        app_signals.append_log.emit(f"[Push] Push channel not available ({response.status_code}), polling only")
+                        response.close()  # hand the pooled connection back before the long wait
+                        self._stop.wait(PUSH_UNSUPPORTED_RETRY)
+                        continue
+                    response.raise_for_status()
+                    logger.info(f"[Push] Connected to {self.url}")
+                    app_signals.append_log.emit("[Push] Connected to task push channel")
+                    self._set_connected(True)
+                    delay = PUSH_RECONNECT_MIN
+                    for event, data in self._iter_events(response.iter_lines()):
+                        if self._stop.is_set():
+                            break
+                        self.on_event(event, data)
+            except (httpx.HTTPError, OSError) as e:
+                logger.warning(f"[Push] Connection lost: {e}")
+                app_signals.append_log.emit(f"[Push] Connection lost: {str(e)}")
+            finally:
+                self._set_connected(False)
+            self._stop.wait(delay * random.uniform(0.5, 1.5))
+            delay = min(delay * 2, PUSH_RECONNECT_MAX)
+
+    @staticmethod
+    def _iter_events(lines):
+        """Yield ``(event, data)`` pairs from an SSE line stream; comments are heartbeats."""
+        event, data = "message", []
+        for line in lines:
+            if not line:
+                if data:
+                    yield event, "\n".join(data)
+                event, data = "message", []
+            elif line.startswith(":"):
+                continue
+            else:
+                field, _, value = line.partition(":")
+                value = value[1:] if value.startswith(" ") else value
+                if field == "event":
+                    event = value
+                elif field == "data":
+                    data.append(value)
+
+
+class ReachabilityTracker:
+    """Backend reachability inferred from real requests, with a circuit breaker.
+
+    Successful and failed task fetches are reported through ``record_success``
+    and ``record_failure``. After ``failure_threshold`` consecutive failures the
+    circuit opens: ``allow_request`` returns False without touching the network
+    until the cooldown passes, then sends a single HEAD probe. A failed probe
+    doubles the cooldown; any answer below 500 closes the circuit again.
+    """
+
+    def __init__(self, probe_url, failure_threshold=REACHABILITY_FAILURE_THRESHOLD,
+                 cooldown=REACHABILITY_COOLDOWN, max_cooldown=REACHABILITY_MAX_COOLDOWN):
+        self.probe_url = probe_url
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until = 0.0
+        self.state = "up"
+
+    def record_success(self):
+        if self.state != "up":
+            logger.info("[Reachability] Backend reachable again")
+            app_signals.append_log.emit("[Reachability] Backend reachable again")
+        self.state = "up"
+        self.failures = 0
+        self.cooldown = self.base_cooldown
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "up" and self.failures >= self.failure_threshold:
+            logger.warning(f"[Reachability] Backend unreachable after {self.failures} failures, pausing task fetches")
+            app_signals.append_log.emit(f"[Reachability] Backend unreachable after {self.failures} failures, pausing task fetches")
+            self._open()
+        elif self.state == "down":
+            self._open()
+
+    def _open(self):
+        self.state = "down"
+        self.open_until = time.monotonic() + self.cooldown
+        self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+
+    def allow_request(self):
+        """True when a real request may go out; probes once the cooldown has passed."""
+        if self.state == "up":
+            return True
+        if time.monotonic() < self.open_until:
+            return False
+        try:
+            response = HTTP_SESSION.head(self.probe_url, timeout=5, follow_redirects=False)
+            reachable = response.status_code < 500
+        except httpx.HTTPError as e:
+            logger.debug(f"[Reachability] Probe failed: {e}")
+            reachable = False
+        if reachable:
+            self.record_success()
+        else:
+            self._open()
+        return reachable
+
+
+class AdaptivePollScheduler:
+    """Task poll interval that tightens while tasks flow and backs off otherwise.
+
+    Each empty poll multiplies the interval by ``idle_backoff`` and each failed
+    one by ``error_backoff``, up to ``max_interval``; a poll that returns tasks
+    resets it to ``min_interval``. Every delay handed out is jittered so that
+    clients started together drift apart instead of polling in lockstep.
+    """
+
+    def __init__(self, min_interval=API_POLL_INTERVAL, max_interval=API_POLL_INTERVAL_MAX,
+                 idle_backoff=API_POLL_IDLE_BACKOFF, error_backoff=API_POLL_ERROR_BACKOFF, jitter=API_POLL_JITTER):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.idle_backoff = idle_backoff
+        self.error_backoff = error_backoff
+        self.jitter = jitter
+        self.interval = min_interval
+        self.state = "active"
+
+    def record_tasks(self, count):
+        if count:
+            self.interval = self.min_interval
+            self.state = "active"
+        else:
+            self.interval = min(self.max_interval, self.interval * self.idle_backoff)
+            self.state = "idle"
+
+    def record_error(self):
+        self.interval = min(self.max_interval, self.interval * self.error_backoff)
+        self.state = "backoff"
+
+    def next_delay(self):
+        """Jittered delay in ms until the next poll."""
+        return max(self.min_interval * (1 - self.jitter),
+                   self.interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def initial_delay(self):
+        """Random offset for the first poll, spreading out clients that start together."""
+        return random.uniform(0, self.min_interval)
+
+
+class ExpiringSet:
+    """Thread-safe set whose members expire ``ttl`` seconds after they were last added.
+
+    Members are kept in insertion order in an OrderedDict, so the oldest sit at
+    the front: membership is O(1), and expiry and the ``max_size`` bound only
+    ever pop from the front (amortised O(1) per add).
+    """
+
+    def __init__(self, ttl, max_size):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._items = OrderedDict()  # member -> time added
+        self._lock = Lock()
+
+    def add(self, member):
+        with self._lock:
+            self._items[member] = time.monotonic()
+            self._items.move_to_end(member)
+            self._evict()
+
+    def discard(self, member):
+        with self._lock:
+            self._items.pop(member, None)
+
+    def __contains__(self, member):
+        with self._lock:
+            added = self._items.get(member)
+            if added is None:
+                return False
+            if time.monotonic() - added >= self.ttl:
+                del self._items[member]
+                return False
+            return True
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    def prune(self):
+        """Drop expired members; returns how many are left."""
+        with self._lock:
+            self._evict()
+            return len(self._items)
+
+    def _evict(self):
+        expires_before = time.monotonic() - self.ttl
+        while self._items:
+            member, added = next(iter(self._items.items()))
+            if added > expires_before and len(self._items) <= self.max_size:
+                break
+            self._items.popitem(last=False)
+
+
+# ===================== Transfer scheduler =====================
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on concurrent NAS transfers, tuned from measured throughput.
+
+    Used as a context manager around each transfer, like the semaphore it
+    replaced. ``record`` reports a finished transfer and keeps an estimate of
+    aggregate throughput per concurrency level. While transfers are waiting
+    for a slot, the limit grows by one; if the level reached does not beat
+    the one below it by ``min_gain``, the limit is cut multiplicatively, and
+    ``record_failure`` (a network error) halves it.
+    """
+
+    def __init__(self, initial=NAS_CONCURRENCY_INITIAL, minimum=NAS_CONCURRENCY_MIN, maximum=None, log=None):
+        self.minimum = minimum
+        self.maximum = maximum or max(initial, minimum)
+        self.limit = max(minimum, min(initial, self.maximum))
+        self.throughput = 0.0  # estimated aggregate bytes/s at the current limit
+        self.log = log
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._levels = {}  # concurrency level -> (aggregate bytes/s EWMA, last update)
+        self._last_adjust = 0.0
+
+    def __enter__(self):
+        with self._cond:
+            self._waiting += 1
+            while self._active >= self.limit:
+                self._cond.wait()
+            self._waiting -= 1
+            self._active += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+        return False
+
+    def record(self, nbytes, seconds):
+        """Report a transfer of ``nbytes`` that took ``seconds`` while holding a slot."""
+        if nbytes <= 0 or seconds <= 0:
+            return
+        with self._cond:
+            now = time.monotonic()
+            level = self.limit
+            aggregate = nbytes / seconds * max(1, self._active)
+            previous = self._levels.get(level)
+            if previous and now - previous[1] <= NAS_CONCURRENCY_SAMPLE_TTL:
+                aggregate = previous[0] * 0.7 + aggregate * 0.3
+            self._levels[level] = (aggregate, now)
+            self.throughput = aggregate
+            if now - self._last_adjust < NAS_CONCURRENCY_ADJUST_INTERVAL:
+                return
+            lower = self._levels.get(level - 1)
+            if (lower and now - lower[1] <= NAS_CONCURRENCY_SAMPLE_TTL and level > self.minimum
+                    and aggregate < lower[0] * (1 + NAS_CONCURRENCY_MIN_GAIN)):
+                self._set_limit(min(level - 1, int(level * NAS_CONCURRENCY_NO_GAIN_DECREASE)), "no throughput gain")
+            elif self._waiting and level < self.maximum:
+                self._set_limit(level + 1, "transfers waiting")
+
+    def record_failure(self):
+        with self._cond:
+            if self.limit > self.minimum:
+                self._set_limit(int(self.limit * NAS_CONCURRENCY_DECREASE), "network failure")
+
+    def _set_limit(self, limit, reason):
+        old_limit = self.limit
+        self.limit = max(self.minimum, min(self.maximum, limit))
+        self._last_adjust = time.monotonic()
+        self._cond.notify_all()
+        message = f"[Concurrency] NAS transfer limit {old_limit} -> {self.limit} ({reason}), {self.stats()}"
+        logger.info(message)
+        if self.log:
+            self.log(message)
+
+    def stats(self):
+        return (f"limit={self.limit} active={self._active} waiting={self._waiting} "
+                f"throughput={self.throughput / (1024 * 1024):.1f} MB/s")
+
+
+class TransferScheduler:
+    """Priority queues with their own worker threads, one queue per lane.
+
+    ``submit`` returns a Future, as an executor would. Each lane runs its jobs
+    lowest ``priority`` first (FIFO among equals), so small files in the small
+    lane never wait behind a multi-gigabyte PSB in the large one. Queue depth
+    and time spent waiting are reported through ``log``.
+    """
+
+    _STOP = (float("inf"),)
+
+    def __init__(self, lanes, log=None):
+        self.log = log
+        self._counter = itertools.count()
+        self._queues = {}
+        self._workers = {}
+        for lane, workers in lanes.items():
+            self._queues[lane] = PriorityQueue()
+            self._workers[lane] = [
+                Thread(target=self._work, args=(lane,), name=f"transfer-{lane}-{i}", daemon=True)
+                for i in range(max(1, workers))
+            ]
+            for thread in self._workers[lane]:
+                thread.start()
+
+    def submit(self, lane, priority, fn, *args, label=""):
+        future = Future()
+        self._queues[lane].put((priority, next(self._counter), time.monotonic(), future, fn, args, label))
+        self._log(f"[Scheduler] Queued {label} in {lane} lane, queue depth {self.depth(lane)}")
+        return future
+
+    def depth(self, lane):
+        return self._queues[lane].qsize()
+
+    def _log(self, message):
+        logger.debug(message)
+        if self.log:
+            self.log(message)
+
+    def _work(self, lane):
+        queue = self._queues[lane]
+        while True:
+            priority, _, queued_at, future, fn, args, label = queue.get()
+            if future is None:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            self._log(f"[Scheduler] Starting {label} in {lane} lane after waiting "
+                      f"{time.monotonic() - queued_at:.1f}s, {queue.qsize()} still queued")
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def shutdown(self):
+        """Stop the workers once the transfers already running finish; queued jobs are cancelled."""
+        for lane, queue in self._queues.items():
+            while True:
+                try:
+                    job = queue.get_nowait()
+                except Empty:
+                    break
+                if job[3] is not None:
+                    job[3].cancel()
+            for _ in self._workers[lane]:
+                queue.put((self._STOP, next(self._counter), 0, None, None, (), ""))
+
+
 class FileWatcherWorker(QObject):
     show_dialog = Signal(str, str, str)  # Signal for title, message, dialog_type
     status_update = Signal(str)
@@ -1282,6 +2896,7 @@ class FileWatcherWorker(QObject):
     task_list_update = Signal(list)
     cleanup_signal = Signal()
     user_in_other_system = Signal(str)
+    push_event = Signal(str, str)
 
     _instance = None
     _instance_thread = None
@@ -1309,21 +2924,43 @@ class FileWatcherWorker(QObject):
         super().__init__(parent)
         FileWatcherWorker._instance = self
         FileWatcherWorker._instance_thread = QThread.currentThread()
-        self.processed_tasks = set()
         self.running = True
         self._lock = Lock()  # Initialize the lock
         self.last_api_hit_time = None
-        self.next_api_hit_time = None
-        self.api_poll_interval = 3000
+        self.poll_scheduler = AdaptivePollScheduler()
+        self.reachability = ReachabilityTracker(DOWNLOAD_UPLOAD_API)
+        self._task_list_state = {}  # url, ETag and since cursor of the last task list fetch
+        self._task_fingerprints = {}  # task_key -> hash of the task as last fetched
+        self._refetch_task_keys = set()  # failed since the last fetch; forgotten so the next full list returns them
+        self._transfer_queue_resumed = False
+        self.api_poll_interval = self.poll_scheduler.min_interval
+        self.next_api_hit_time = datetime.now(timezone.utc) + timedelta(milliseconds=self.poll_scheduler.initial_delay())
         self.config = {
             "photoshop_path": os.getenv("PHOTOSHOP_PATH", ""),
-            "max_processed_tasks": 1000,
-            "task_retention_hours": 24,
+            "max_processed_tasks": env_int("PREMEDIA_MAX_PROCESSED_TASKS", 1000),
+            "task_retention_hours": env_float("PREMEDIA_TASK_RETENTION_HOURS", 24),
+            "sftp_upload_block_size": env_int("PREMEDIA_SFTP_BLOCK_SIZE", SFTP_UPLOAD_BLOCK_SIZE),
+            "parallel_transfer_threshold": env_int("PREMEDIA_PARALLEL_THRESHOLD", PARALLEL_TRANSFER_THRESHOLD),
+            "parallel_transfer_streams": env_int("PREMEDIA_PARALLEL_STREAMS", PARALLEL_TRANSFER_STREAMS),
+            "small_lane_workers": env_int("PREMEDIA_SMALL_LANE_WORKERS", TRANSFER_SMALL_LANE_WORKERS),
+            "large_lane_workers": env_int("PREMEDIA_LARGE_LANE_WORKERS", TRANSFER_LARGE_LANE_WORKERS),
+            "large_file_threshold": env_int("PREMEDIA_LARGE_FILE_THRESHOLD", TRANSFER_LARGE_FILE_THRESHOLD),
+            "nas_concurrency_initial": env_int("PREMEDIA_NAS_CONCURRENCY", NAS_CONCURRENCY_INITIAL),
+            "upload_rate_limit": env_int("PREMEDIA_UPLOAD_RATE_LIMIT", 0),  # bytes/s, 0 = unlimited
+            "download_rate_limit": env_int("PREMEDIA_DOWNLOAD_RATE_LIMIT", 0),
+            "bandwidth_schedule": parse_bandwidth_schedule(os.getenv("PREMEDIA_BANDWIDTH_SCHEDULE", "")),
+            "push_enabled": os.getenv("PREMEDIA_PUSH", "1") != "0",
+            "push_url": os.getenv("PREMEDIA_PUSH_URL", TASK_PUSH_API),
+            "push_fallback_poll_interval": PUSH_FALLBACK_POLL_INTERVAL,
             "supported_image_extensions": (
                 ".jpg", ".jpeg", ".png", ".gif", ".tiff", ".tif", ".bmp", ".webp",
                 ".psd", ".psb", ".cr2", ".nef", ".arw", ".dng", ".raf", ".pef", ".srw"
             ),
         }
+        # task_key -> submitted; stops re-submitting a task the server keeps listing
+        self.processed_tasks = ExpiringSet(self.config["task_retention_hours"] * 3600, self.config["max_processed_tasks"])
+        self.apply_bandwidth_limits()
+        STATUS_REPORTER.start()  # sends status updates left over from the last session
         logger.info("FileWatcherWorker initialized")
         self.log_update.emit("[FileWatcher] Initialized")
         self.log_update.emit(f"[FileWatcher] Application started at {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S %Z')}")
@@ -1331,6 +2968,13 @@ class FileWatcherWorker(QObject):
         self.timer.setSingleShot(True)  # Single-shot to prevent overlapping ticks
         self.timer.timeout.connect(self.run)
         self.cleanup_signal.connect(self.cleanup)
+        self.push_event.connect(self._on_push_event)
+        self.push_client = None
+        if self.config["push_enabled"]:
+            self.push_client = TaskPushClient(
+                self.config["push_url"], self._push_request, self.push_event.emit, self._on_push_state
+            )
+            self.push_client.start()
         if not self.timer.isActive():
             self.timer.start(self.api_poll_interval)
             logger.debug(f"FileWatcherWorker timer started with {self.api_poll_interval/1000}-second interval")
@@ -1477,12 +3121,44 @@ class FileWatcherWorker(QObject):
     #         update_download_upload_metadata(task_id, "failed")
     #         raise
 
+    def apply_bandwidth_limits(self):
+        """Push the rate caps in ``self.config`` to the throttles shared by all transfers."""
+        schedule = self.config["bandwidth_schedule"]
+        UPLOAD_THROTTLE.configure(self.config["upload_rate_limit"], schedule.get("upload", ()))
+        DOWNLOAD_THROTTLE.configure(self.config["download_rate_limit"], schedule.get("download", ()))
+        for throttle in (UPLOAD_THROTTLE, DOWNLOAD_THROTTLE):
+            logger.info(f"[Bandwidth] {throttle.describe()}")
+            self.log_update.emit(f"[Bandwidth] {throttle.describe()}")
+
+    def _record_throughput(self, size_bytes, duration):
+        limiter = getattr(self, 'transfer_limiter', None)
+        if limiter is not None:
+            limiter.record(size_bytes, duration)
+            self.log_update.emit(f"[Concurrency] {limiter.stats()}")
+
+    def _record_transfer_failure(self, error):
+        """Network-level failures tell the limiter the link is overloaded; file errors do not."""
+        limiter = getattr(self, 'transfer_limiter', None)
+        network_errors = (socket.timeout, TimeoutError, ConnectionError, EOFError)
+        if paramiko is not None:
+            network_errors += (paramiko.SSHException,)
+        if limiter is not None and isinstance(error, network_errors):
+            limiter.record_failure()
+
+    def _transfer_streams(self, item, file_size):
+        """Number of parallel SFTP streams for a file; items may set ``transfer_streams``."""
+        if file_size < self.config["parallel_transfer_threshold"]:
+            return 1
+        try:
+            streams = int(item.get("transfer_streams") or self.config["parallel_transfer_streams"])
+        except (TypeError, ValueError):
+            streams = self.config["parallel_transfer_streams"]
+        return max(1, streams)
+
     def _download_from_nas(self, src_path, dest_path, item, max_retries=1):
         task_id = item.get("id", '')
         spec_id = str(item.get("spec_id"))
         metadata_key = "downloaded_files_with_metadata"
-        cache = load_cache()
-        cache.setdefault(metadata_key, {})
 
         nas_path = item.get("file_path", src_path)
 
@@ -1497,43 +3173,37 @@ class FileWatcherWorker(QObject):
                     print(f"🔁 Retry attempt {attempt}/{max_retries}")
                     update_download_upload_metadata(task_id, "Re-attempting the download")
 
-                # --- FAST SSH CONNECTION ---
-                conn_start = time.time()
-                transport = paramiko.Transport((NAS_IP, NAS_PORT))
-
-                transport.get_security_options().ciphers = (
-                    'aes128-ctr', 'aes192-ctr', 'aes256-ctr'
-                )
-
-                transport.connect(username=NAS_USERNAME, password=NAS_PASSWORD)
-                conn_end = time.time()
-
-                print(f"Connection time: {(conn_end - conn_start) * 1000:.1f} ms")
-
-                # --- SUPER FAST SCP DOWNLOAD ---
+                # --- POOLED SSH CONNECTION ---
                 start_time = time.time()
-
-                with SCPClient(transport, socket_timeout=30) as scp:
-                    scp.get(nas_path, local_path=dest_path)
-
+                progress = TransferProgress(dest_path, "download", True)
+                with NAS_CONNECTION_POOL.connection() as conn:
+                    file_size = conn.sftp.stat(nas_path).st_size
+                    streams = self._transfer_streams(item, file_size)
+                    if streams == 1:
+                        # --- PIPELINED SFTP DOWNLOAD ---
+                        size_bytes = resumable_download(conn.sftp, nas_path, dest_path, callback=progress)
+                if streams > 1:
+                    # --- PARALLEL RANGED DOWNLOAD (connection above is back in the pool) ---
+                    size_bytes = parallel_download(NAS_CONNECTION_POOL, nas_path, dest_path, file_size,
+                                                   streams, callback=progress)
                 end_time = time.time()
 
-                size_mb = Path(dest_path).stat().st_size / (1024 * 1024)
+                size_mb = size_bytes / (1024 * 1024)
                 duration = end_time - start_time
                 speed = size_mb / duration if duration > 0 else 0
 
-                print(f"📥 SCP Downloaded {size_mb:.2f} MB in {duration:.2f}s ({speed:.2f} MB/s)")
-
-                transport.close()
+                print(f"📥 SFTP Downloaded {size_mb:.2f} MB in {duration:.2f}s ({speed:.2f} MB/s)")
+                self.log_update.emit(f"[NAS Pool] {NAS_CONNECTION_POOL.stats()}")
+                self._record_throughput(size_bytes, duration)
                 return  # SUCCESS
 
             except Exception as e:
                 print(f"❌ Download failed (Attempt {attempt}): {e}")
+                self._record_transfer_failure(e)
 
                 if attempt == max_retries:
                     # FINAL FAILURE
-                    cache[metadata_key][spec_id]["api_response"]["request_status"] = "Download Failed"
-                    save_cache(cache, significant_change=True)
+                    set_task_status(metadata_key, spec_id, "Download Failed")
                     update_download_upload_metadata(task_id, "failed")
                     raise
 
@@ -1688,9 +3358,6 @@ class FileWatcherWorker(QObject):
         spec_id = str(item.get("spec_id"))
         metadata_key = "uploaded_files_with_metadata"
 
-        cache = load_cache()
-        cache.setdefault(metadata_key, {})
-
         src_path = Path(src_path)
 
         attempt = 0
@@ -1700,8 +3367,7 @@ class FileWatcherWorker(QObject):
                 # First check only on first attempt
                 if attempt == 0:
                     if not src_path.exists():
-                        cache[metadata_key][spec_id]["api_response"]["request_status"] = "Upload Failed"
-                        save_cache(cache, significant_change=True)
+                        set_task_status(metadata_key, spec_id, "Upload Failed")
                         update_download_upload_metadata(task_id, "failed")
                         show_alert_notification("Error (U1)", "Upload failed try again.")
                         raise FileNotFoundError(f"Source file does not exist: {src_path}")
@@ -1710,41 +3376,44 @@ class FileWatcherWorker(QObject):
                     print(f"🔁 Retry attempt {attempt}/{max_retries}")
                     update_download_upload_metadata(task_id, "Re-attempting the upload")
 
-                # --- FAST SSH ---
-                conn_start = time.time()
-                transport = paramiko.Transport((NAS_IP, NAS_PORT))
-                transport.get_security_options().ciphers = (
-                    'aes128-ctr', 'aes192-ctr', 'aes256-ctr'
-                )
-                transport.connect(username=NAS_USERNAME, password=NAS_PASSWORD)
-                conn_end = time.time()
-
-                print(f"Connection time: {(conn_end - conn_start) * 1000:.1f} ms")
-
                 # Destination path
                 dest_path = item.get("file_path", dest_path)
 
-                # --- SUPER FAST SCP UPLOAD ---
                 start = time.time()
-                fast_scp_upload(transport, str(src_path), dest_path)
+                progress = TransferProgress(src_path, "upload", True)
+                streams = self._transfer_streams(item, src_path.stat().st_size)
+                if streams > 1:
+                    # --- PARALLEL RANGED UPLOAD ---
+                    size_bytes = parallel_upload(
+                        NAS_CONNECTION_POOL, str(src_path), dest_path, streams, callback=progress,
+                        block_size=self.config["sftp_upload_block_size"]
+                    )
+                else:
+                    # --- POOLED SSH CONNECTION ---
+                    with NAS_CONNECTION_POOL.connection() as conn:
+                        # --- RESUMABLE SFTP UPLOAD ---
+                        size_bytes = resumable_upload(
+                            conn.sftp, str(src_path), dest_path, callback=progress,
+                            block_size=self.config["sftp_upload_block_size"]
+                        )
                 end = time.time()
 
                 duration = end - start
-                size_mb = src_path.stat().st_size / (1024 * 1024)
+                size_mb = size_bytes / (1024 * 1024)
                 speed = size_mb / duration if duration > 0 else 0
 
                 print(f"⚡ Uploaded {size_mb:.2f} MB in {duration:.2f}s ({speed:.2f} MB/s)")
-
-                transport.close()
+                self.log_update.emit(f"[NAS Pool] {NAS_CONNECTION_POOL.stats()}")
+                self._record_throughput(size_bytes, duration)
                 return  # SUCCESS → exit
 
             except Exception as e:
                 print(f"❌ Upload failed (Attempt {attempt}): {e}")
+                self._record_transfer_failure(e)
 
                 if attempt == max_retries:
                     # Final failure
-                    cache[metadata_key][spec_id]["api_response"]["request_status"] = "Upload Failed"
-                    save_cache(cache, significant_change=True)
+                    set_task_status(metadata_key, spec_id, "Upload Failed")
                     update_download_upload_metadata(task_id, "failed")
                     show_alert_notification("Error (U3)", "Upload failed try again.")
                     raise
@@ -2147,17 +3816,14 @@ class FileWatcherWorker(QObject):
 
         status_prefix = "Download" if action_type.lower() == "download" else "Upload"
         metadata_key = "downloaded_files_with_metadata" if action_type.lower() == "download" else "uploaded_files_with_metadata"
+        task_key = f"{task_id}:{action_type.lower()}"
 
         try:
             logger.debug(f"Starting file transfer for task {task_id}, action_type: {action_type}")
 
-            # Load cache once
-            cache = load_cache()
-            cache.setdefault(metadata_key, {})
-
             # Initialize task entry if missing
-            if task_id not in cache[metadata_key]:
-                cache[metadata_key][spec_id] = {
+            if get_task_record(metadata_key, task_id) is None:
+                put_task_record(metadata_key, spec_id, {
                     "local_path": dest_path if action_type.lower() == "download" else src_path,
                     "api_response": {
                         "id": task_id,
@@ -2181,11 +3847,10 @@ class FileWatcherWorker(QObject):
                         "request_status": f"{status_prefix} Started"
                     },
                     
-                }
+                })
 
-            # Save initial "In Progress" state
-            save_cache(cache, significant_change=True)
             update_download_upload_metadata(task_id, "In Progress")
+            self._set_queue_state(task_key, "transferring", item)
             logger.info(f"[{status_prefix} In Progress] Task {task_id}")
             self.progress_update.emit(f"{action_type} (Task {task_id}): {Path(src_path).name}", dest_path, 10)
 
@@ -2200,14 +3865,12 @@ class FileWatcherWorker(QObject):
                 else:
                     self._download_from_http(src_path, dest_path)
 
+                self._set_queue_state(task_key, "verifying")
                 if not os.path.exists(dest_path):
-                    cache[metadata_key][spec_id]["api_response"]["request_status"] = f"{status_prefix} Failed"
-                    save_cache(cache, significant_change=True)
+                    set_task_status(metadata_key, spec_id, f"{status_prefix} Failed")
                     raise FileNotFoundError(f"{status_prefix} file not found: {dest_path}")
 
-                cache[metadata_key][spec_id]["api_response"]["request_status"] = f"{status_prefix} Completed"
-                cache[metadata_key][spec_id]["local_path"] = dest_path
-                save_cache(cache, significant_change=True)
+                set_task_status(metadata_key, spec_id, f"{status_prefix} Completed", local_path=dest_path)
                 update_download_upload_metadata(task_id, "completed")
 
                 # Optional: Open with Photoshop
@@ -2215,15 +3878,14 @@ class FileWatcherWorker(QObject):
                     key_val = item.get("key_val")
                     self.open_with_photoshop(dest_path, key_val)
                 except Exception as e:
-                    cache[metadata_key][spec_id]["api_response"]["request_status"] = f"{status_prefix} Failed Photoshop"
-                    save_cache(cache, significant_change=True)
+                    set_task_status(metadata_key, spec_id, f"{status_prefix} Failed Photoshop")
                     logger.warning(f"Failed to open {dest_path} with Photoshop: {str(e)}")
                     self.log_update.emit(f"[Transfer] Warning: Failed to open {dest_path} with Photoshop: {str(e)}")
 
                 # Optional: Conversion to JPG
                 # cache[metadata_key][task_id]["api_response"]["request_status"] = f"{status_prefix} Conversion Started"
                 # save_cache(cache, significant_change=True)
-                # local_jpg, _ = process_single_file(dest_path)
+                # local_jpg, _ = image_convert.process_single_file(dest_path)
                 # if local_jpg:
                 #     cache[metadata_key][task_id]["api_response"]["request_status"] = f"{status_prefix} Conversion Completed"
                 #     save_cache(cache, significant_change=True)
@@ -2241,8 +3903,7 @@ class FileWatcherWorker(QObject):
             # ------------------------------
             elif action_type.lower() in ("upload", "replace"):
                 if not os.path.exists(src_path):
-                    cache[metadata_key][spec_id]["api_response"]["request_status"] = f"{status_prefix} Source Missing"
-                    save_cache(cache, significant_change=True)
+                    set_task_status(metadata_key, spec_id, f"{status_prefix} Source Missing")
                     raise FileNotFoundError(f"Source file does not exist: {src_path}")
 
                 # Check if file is accessible
@@ -2250,20 +3911,18 @@ class FileWatcherWorker(QObject):
                     with open(src_path, 'rb') as f:
                         f.read(1)
                 except (PermissionError, IOError):
-                    cache[metadata_key][spec_id]["api_response"]["request_status"] = f"{status_prefix} File In Use"
-                    save_cache(cache, significant_change=True)
+                    set_task_status(metadata_key, spec_id, f"{status_prefix} File In Use")
                     raise RuntimeError(f"File {src_path} is currently in use by another application.")
 
                 # Upload to NAS or HTTP
                 if is_nas_dest:
                     self._upload_to_nas(src_path, dest_path, item)
-                    cache[metadata_key][spec_id]["api_response"]["request_status"] = f"{status_prefix} Completed"
+                    self._set_queue_state(task_key, "verifying")
+                    set_task_status(metadata_key, spec_id, f"{status_prefix} Completed")
                 else:
-                    cache[metadata_key][spec_id]["api_response"]["request_status"] = f"{status_prefix} HTTP Not Implemented"
-                    save_cache(cache, significant_change=True)
+                    set_task_status(metadata_key, spec_id, f"{status_prefix} HTTP Not Implemented")
                     raise NotImplementedError("HTTP upload not implemented")
 
-                save_cache(cache, significant_change=True)
                 update_download_upload_metadata(task_id, "completed")
                 self.progress_update.emit(f"{action_type} Completed (Task {task_id}): {Path(src_path).name}", dest_path, 100)
 
@@ -2280,37 +3939,30 @@ class FileWatcherWorker(QObject):
                         'nas_path': "softwaremedia/IR_prod/" + dest_path,
                     }
 
-                    response = requests.post(
-                        DRUPAL_DB_ENTRY_API,
-                        data=request_data,
-                        headers={},
-                        verify=False
-                    )
+                    response = api_request("POST", DRUPAL_DB_ENTRY_API, data=request_data)
 
-                    cache[metadata_key][spec_id]["api_response"]["request_status"] = f"{status_prefix} completed"
-                    save_cache(cache, significant_change=True)
+                    set_task_status(metadata_key, spec_id, f"{status_prefix} completed")
                     update_download_upload_metadata(task_id, "Conversion Started")
                     logging.info(f"DRUPAL_DB_ENTRY_API data success: {response.text}")
 
                 except Exception as e:
-                    cache[metadata_key][spec_id]["status"] = f"{status_prefix} API Call Failed"
-                    save_cache(cache, significant_change=True)
+                    set_task_status(metadata_key, spec_id, f"{status_prefix} API Call Failed")
                     logging.error(f"DRUPAL_DB_ENTRY_API call error: {str(e)}")
                 
             else:
                 raise ValueError(f"Invalid action_type: {action_type}")
+            self._set_queue_state(task_key, "done")
             IS_APP_ACTIVE_UPLOAD_DOWNLOAD = False
 
         except Exception as e:
             # Update cache with failure
-            cache.setdefault(metadata_key, {})
-            if spec_id not in cache[metadata_key]:
-                cache[metadata_key][spec_id] = {"local_path": dest_path, "status": f"{status_prefix} Failed"}
+            if get_task_record(metadata_key, spec_id) is None:
+                set_task_status(metadata_key, spec_id, f"{status_prefix} Failed", local_path=dest_path)
             else:
-                cache[metadata_key][spec_id]["api_response"]["request_status"] = f"{status_prefix} Failed"
+                set_task_status(metadata_key, spec_id, f"{status_prefix} Failed")
 
-            save_cache(cache, significant_change=True)
             update_download_upload_metadata(task_id, "failed")
+            self._set_queue_state(task_key, "failed", error=str(e))
             IS_APP_ACTIVE_UPLOAD_DOWNLOAD = False
             logger.error(f"{status_prefix} error (Task {task_id}): {str(e)}")
             self.log_update.emit(f"[Transfer] Failed (Task {task_id}): {str(e)}")
@@ -2327,21 +3979,25 @@ class FileWatcherWorker(QObject):
                 return
             current_time = datetime.now(timezone.utc)
             if hasattr(self, 'next_api_hit_time') and self.next_api_hit_time and current_time < self.next_api_hit_time:
+                # Most timer ticks land here once the interval backs off; keep them out of the log window
                 logger.debug(f"[{current_time.isoformat()}] API call skipped: Too soon since last call, instance: {id(self)}")
-                self.log_update.emit("[FileWatcher] Skipped: Too soon since last API call")
                 return
             self._busy = True
             self._is_running = True
         try:
-            # Initialize executor and semaphore if not already set
-            if not hasattr(self, 'executor'):
-                self.executor = ThreadPoolExecutor(max_workers=2)  # Set max_workers to 2 for parallel processing
-                logger.debug(f"[{datetime.now(timezone.utc).isoformat()}] Initialized ThreadPoolExecutor with max_workers=2, instance: {id(self)}")
-                self.log_update.emit("[FileWatcher] Initialized ThreadPoolExecutor with max_workers=2")
-            if not hasattr(self, 'sftp_semaphore'):
-                self.sftp_semaphore = Semaphore(2)  # Limit concurrent SFTP connections
-                logger.debug(f"[{datetime.now(timezone.utc).isoformat()}] Initialized SFTP semaphore with limit=2, instance: {id(self)}")
-                self.log_update.emit("[FileWatcher] Initialized SFTP semaphore with limit=2")
+            # Initialize transfer scheduler and semaphore if not already set
+            lanes = {"small": self.config["small_lane_workers"], "large": self.config["large_lane_workers"]}
+            if not hasattr(self, 'transfer_scheduler'):
+                self.transfer_scheduler = TransferScheduler(lanes, log=self.log_update.emit)
+                logger.debug(f"[{datetime.now(timezone.utc).isoformat()}] Initialized TransferScheduler with lanes={lanes}, instance: {id(self)}")
+                self.log_update.emit(f"[FileWatcher] Initialized TransferScheduler with lanes={lanes}")
+            if not hasattr(self, 'transfer_limiter'):
+                # Limit concurrent SFTP connections, tuned from measured throughput
+                self.transfer_limiter = AdaptiveConcurrencyLimiter(
+                    self.config["nas_concurrency_initial"], maximum=sum(lanes.values()), log=self.log_update.emit
+                )
+                logger.debug(f"[{datetime.now(timezone.utc).isoformat()}] Initialized NAS transfer limiter: {self.transfer_limiter.stats()}, instance: {id(self)}")
+                self.log_update.emit(f"[FileWatcher] Initialized NAS transfer limiter: {self.transfer_limiter.stats()}")
             if not self.running:
                 logger.info(f"[{current_time.isoformat()}] File watcher stopped, instance: {id(self)}")
                 self.log_update.emit("[FileWatcher] Stopped: Worker is not running")
@@ -2349,17 +4005,16 @@ class FileWatcherWorker(QObject):
             logger.debug(f"[{current_time.isoformat()}] Starting file watcher run, instance: {id(self)}")
             self.log_update.emit("[API Scan] Starting file watcher run")
 
-            if not self.check_connectivity():
-                logger.warning(f"[{current_time.isoformat()}] Connectivity check failed, will retry on next run, instance: {id(self)}")
-                self.status_update.emit("Connectivity check failed, will retry")
-                self.log_update.emit("[API Scan] Connectivity check failed")
+            if not self.reachability.allow_request():
+                self.poll_scheduler.record_error()
+                logger.debug(f"[{current_time.isoformat()}] Backend unreachable, skipping task fetch, instance: {id(self)}")
+                self.status_update.emit("Server unreachable, will retry")
                 return
 
-            cache = load_cache()
-            user_id = cache.get('user_id', '')
-            token = cache.get('token', '')
-            cache.setdefault('user_type', 'operator')
-            save_cache(cache)
+            user_id = get_cached('user_id', '')
+            token = get_cached('token', '')
+            if get_cached('user_type') is None:
+                set_cached('user_type', 'operator', significant_change=False)
             if not user_id or not token:
                 logger.error(f"[{current_time.isoformat()}] No user_id or token found in cache, instance: {id(self)}")
                 self.status_update.emit("No user_id or token found in cache")
@@ -2369,16 +4024,14 @@ class FileWatcherWorker(QObject):
                 self.log_update.emit("[FileWatcher] Timer remains active for retry after re-authentication")
                 return
 
+            if not self._transfer_queue_resumed:
+                self._transfer_queue_resumed = True
+                self._resume_transfer_queue()
+
             self.status_update.emit("Checking for file tasks...")
             self.log_update.emit("[API Scan] Starting file task check")
             app_signals.append_log.emit("[API Scan] Initiating file task check")
             self.last_api_hit_time = current_time
-            self.next_api_hit_time = self.last_api_hit_time + timedelta(milliseconds=self.api_poll_interval)
-            app_signals.update_timer_status.emit(
-                f"Last API hit: {self.last_api_hit_time.strftime('%Y-%m-%d %H:%M:%S %Z')} | "
-                f"Next API hit: {self.next_api_hit_time.strftime('%Y-%m-%d %H:%M:%S %Z')} | "
-                f"Interval: {self.api_poll_interval/1000:.1f}s"
-            )
             headers = {"Authorization": f"Bearer {token}"}
             max_retries = 3
             tasks = []
@@ -2386,31 +4039,35 @@ class FileWatcherWorker(QObject):
             # api_url = f"{DOWNLOAD_UPLOAD_API}?user_id={quote(user_id)}&machine_id={USER_SYSTEM_INFO.get("identifiers", {}).get("encoded_mac", "")}"
             # machine_id = USER_SYSTEM_INFO.get("encoded_mac", "")
             # api_url = f"{DOWNLOAD_UPLOAD_API}?user_id={quote(user_id)}&machine_id={USER_SYSTEM_INFO.get('encoded_mac', '')}"
-            if isinstance(USER_SYSTEM_INFO, dict):
-                machine_id = USER_SYSTEM_INFO.get("encoded_mac", "")
-            elif isinstance(USER_SYSTEM_INFO, list) and USER_SYSTEM_INFO:
-                # if it's a list, use the first element that contains encoded_mac
-                first_entry = USER_SYSTEM_INFO[0]
-                machine_id = first_entry.get("encoded_mac", "") if isinstance(first_entry, dict) else ""
-            else:
-                machine_id = ""
+            machine_id = self._machine_id()
 
             print(f"[DEBUG] USER_SYSTEM_INFO type={type(USER_SYSTEM_INFO)}, machine_id={machine_id}")
             api_url = f"{DOWNLOAD_UPLOAD_API}?user_id={quote(user_id)}&machine_id={machine_id}"
             # machine_id = USER_SYSTEM_INFO.get("encoded_mac", "") if isinstance(USER_SYSTEM_INFO, dict) else ""
             # api_url = f"{DOWNLOAD_UPLOAD_API}?user_id={quote(user_id)}&machine_id={machine_id}"
 
+            if self._task_list_state.get("url") != api_url:
+                # Validators belong to one user/machine task list
+                self._task_list_state = {"url": api_url}
+                self._task_fingerprints = {}
+            if self._task_list_state.get("etag"):
+                headers["If-None-Match"] = self._task_list_state["etag"]
+            params = {"since": self._task_list_state["cursor"]} if self._task_list_state.get("cursor") else None
+
             for attempt in range(max_retries):
                 try:
                     logger.debug(f"[{datetime.now(timezone.utc).isoformat()}] Hitting API: {api_url}, instance: {id(self)}")
                     app_signals.append_log.emit(f"[API Scan] Hitting API: {api_url}")
-                    response = HTTP_SESSION.get(api_url, headers=headers, verify=False, timeout=60)
-                    
-                    
-                    response_data = response.json()
+                    response = HTTP_SESSION.get(api_url, headers=headers, params=params, timeout=60)
+                    if response.status_code < 500:
+                        self.reachability.record_success()
+
+                    if response.status_code == 304:
+                        logger.debug(f"[{datetime.now(timezone.utc).isoformat()}] Task list unchanged (304), instance: {id(self)}")
+                        app_signals.api_call_status.emit(api_url, "Not Modified", response.status_code)
+                        self.poll_scheduler.record_tasks(0)
+                        return
 
-                    
-                    
                     logger.debug(f"[{datetime.now(timezone.utc).isoformat()}] API response: Status={response.status_code}, Content={response.text[:500]}..., instance: {id(self)}")
                     app_signals.append_log.emit(f"[API Scan] API response: Status={response.status_code}, Content={response.text[:500]}...")
                     app_signals.api_call_status.emit(api_url, "Success" if response.status_code == 200 else f"Failed: {response.status_code}", response.status_code)
@@ -2439,29 +4096,36 @@ class FileWatcherWorker(QObject):
                         self.log_update.emit(f"[API Scan] Unexpected API response type: {type(response_data)}")
                         tasks = []
 
-
-                    
-                    tasks = response_data if isinstance(response_data, list) else response_data.get('data', [])
                     if not isinstance(tasks, list):
                         logger.error(f"[{datetime.now(timezone.utc).isoformat()}] API returned non-list tasks: {type(tasks)}, data: {tasks}, instance: {id(self)}")
                         self.log_update.emit(f"[API Scan] Failed: API returned non-list tasks: {type(tasks)}")
                         return
+                    # Saved only once this tick's tasks are submitted, see _commit_task_list
+                    list_validators = {"etag": response.headers.get("ETag")}
+                    if isinstance(response_data, dict) and response_data.get("cursor"):
+                        list_validators["cursor"] = response_data["cursor"]
                     logger.debug(f"[{datetime.now(timezone.utc).isoformat()}] Retrieved {len(tasks)} tasks: {tasks}, instance: {id(self)}")
                     app_signals.append_log.emit(f"[API Scan] Retrieved {len(tasks)} tasks from API")
                     break
-                except RequestException as e:
+                except (httpx.HTTPError, json.JSONDecodeError) as e:
                     logger.error(f"[{datetime.now(timezone.utc).isoformat()}] Attempt {attempt + 1} failed fetching tasks from {api_url}: {e}, instance: {id(self)}")
                     self.log_update.emit(f"[API Scan] Failed to fetch tasks (attempt {attempt + 1}): {str(e)}")
                     if attempt < max_retries - 1:
                         time.sleep(2 ** attempt)
                         continue
+                    self.poll_scheduler.record_error()
+                    self.reachability.record_failure()
                     logger.warning(f"[{datetime.now(timezone.utc).isoformat()}] Max retries reached for task fetch, will retry on next run, instance: {id(self)}")
                     self.status_update.emit(f"Error fetching tasks after retries: {str(e)}")
                     self.log_update.emit(f"[API Scan] Failed to fetch tasks after retries: {str(e)}")
                     app_signals.append_log.emit(f"[API Scan] Failed: Task fetch error after retries - {str(e)}")
                     return
 
-            unprocessed_tasks = [task for task in tasks if f"{task.get('id', '')}:{task.get('request_type', '').lower()}" not in self.processed_tasks]
+            changed_tasks, fingerprints = self._changed_tasks(tasks, delta=params is not None)
+            unprocessed_tasks = [task for task in changed_tasks if f"{task.get('id', '')}:{task.get('request_type', '').lower()}" not in self.processed_tasks]
+            # In flight or completed already: deliberately skipped, so safe to fingerprint
+            handled_keys = {self._task_key(task) for task in changed_tasks} - {self._task_key(task) for task in unprocessed_tasks}
+            self.poll_scheduler.record_tasks(len(unprocessed_tasks))
 
             # ✅ FIXED: Properly build download and upload task lists
             download_tasks = []
@@ -2500,74 +4164,21 @@ class FileWatcherWorker(QObject):
             self.log_update.emit(f"[API Scan] Task list emitted to GUI: {len(download_tasks)} download tasks, {len(upload_tasks)} upload tasks")
 
             self._clean_processed_tasks()
-            futures = []
+            futures = {}  # Future -> task_key
+            # Submit in priority order so each lane's FIFO tie-break follows it too
+            unprocessed_tasks = sorted(
+                (item for item in unprocessed_tasks if isinstance(item, dict)), key=self._transfer_priority
+            ) + [item for item in unprocessed_tasks if not isinstance(item, dict)]
             for item in unprocessed_tasks:
-                if not isinstance(item, dict):
-                    logger.error(f"[{datetime.now(timezone.utc).isoformat()}] Invalid task item type: {type(item)}, item: {item}, instance: {id(self)}")
-                    self.log_update.emit(f"[API Scan] Failed: Invalid task item type: {type(item)}")
-                    app_signals.update_file_list.emit("", f"Invalid task: {type(item)}", "unknown", 0, False)
-                    continue
-
-                task_id = str(item.get('id', ''))
-                file_path = item.get('file_path', '')
-                if not file_path:
-                    logger.error(f"[{datetime.now(timezone.utc).isoformat()}] Invalid task {task_id}: Missing file_path, item: {item}, instance: {id(self)}")
-                    self.log_update.emit(f"[API Scan] Failed: Invalid task {task_id} - Missing file_path")
-                    app_signals.update_file_list.emit("", f"Invalid task {task_id}: Missing file_path", "unknown", 0, False)
-                    continue
-
-                file_name = item.get('file_name', Path(file_path).name)
-                action_type = item.get('request_type', '').lower()
-                task_key = f"{task_id}:{action_type}"
-                is_online = 'http' in file_path.lower()
-                local_path = str(BASE_TARGET_DIR / file_path.lstrip("/"))
-
-                    # ✅ Prevent duplicate submissions
-                with self._lock:
-                    if task_key in self.processed_tasks:
-                        logger.debug(f"[{datetime.now(timezone.utc).isoformat()}] Skipping duplicate task: {task_key}, instance: {id(self)}")
-                        self.log_update.emit(f"[API Scan] Skipped duplicate task: {task_key}")
-                        continue
-                    self.processed_tasks.add(task_key)  # Mark immediately as in-progress
-                    update_download_upload_metadata(task_id, "in progress")
-
-                logger.debug(f"[{datetime.now(timezone.utc).isoformat()}] Submitting task: task_key={task_key}, task_id={task_id}, action_type={action_type}, file_path={file_path}, instance: {id(self)}")
-                self.log_update.emit(f"[API Scan] Submitting task: task_key={task_key}, task_id={task_id}, action_type={action_type}, file_path={file_path}")
-
-                futures.append(
-                    self.executor.submit(
-                        self._process_task,
-                        task_id, file_name, file_path, action_type, local_path, is_online, item, 3, self.sftp_semaphore
-                    )
-                )
-
-            # Start a background thread to handle task results
-            def handle_task_results(futures):
-                completed_tasks = 0
-                failed_tasks = 0
-                updates = []
-                for future in futures:
-                    try:
-                        result = future.result()  # Wait for each task to complete
-                        updates.append(result['update'])
-                        if result['success']:
-                            completed_tasks += 1
-                            with self._lock:
-                                self.processed_tasks.add(result['task_key'])
-                        else:
-                            failed_tasks += 1
-                    except Exception as e:
-                        logger.error(f"[{datetime.now(timezone.utc).isoformat()}] Task processing error: {str(e)}, instance: {id(self)}")
-                        self.log_update.emit(f"[API Scan] Task processing error: {str(e)}")
-                        failed_tasks += 1
-                if updates:
-                    for update in updates:
-                        app_signals.update_file_list.emit(*update)
-                logger.info(f"[{datetime.now(timezone.utc).isoformat()}] Background task summary: {completed_tasks} completed, {failed_tasks} failed, instance: {id(self)}")
-                self.log_update.emit(f"[FileWatcher] Background task summary: {completed_tasks} completed, {failed_tasks} failed")
+                future = self._submit_task(item)
+                if future is not None:
+                    futures[future] = self._task_key(item)
+                if isinstance(item, dict):
+                    handled_keys.add(self._task_key(item))
+            self._commit_task_list(list_validators, fingerprints, {self._task_key(task) for task in changed_tasks}, handled_keys)
 
             # Launch background thread to process results
-            Thread(target=handle_task_results, args=(futures,), daemon=True).start()
+            Thread(target=self._collect_task_results, args=(futures,), daemon=True).start()
             self.status_update.emit("File tasks check completed")
             self.log_update.emit(f"[API Scan] File tasks check completed, submitted {len(futures)} tasks")
             app_signals.append_log.emit(f"[API Scan] Completed: Submitted {len(futures)} tasks")
@@ -2580,11 +4191,160 @@ class FileWatcherWorker(QObject):
         finally:
             self._busy = False
             self._is_running = False
+            self._schedule_next_poll()
             logger.debug(f"[{datetime.now(timezone.utc).isoformat()}] File watcher cycle completed, instance: {id(self)}")
             self.log_update.emit("[FileWatcher] Cycle completed, awaiting next timer tick")
             # if self.running:
             #     self.timer.start(self.api_poll_interval)
 
+    def _submit_task(self, item):
+        """Queue one fetched task on its transfer lane; returns the Future, or None if skipped."""
+        if not isinstance(item, dict):
+            logger.error(f"[{datetime.now(timezone.utc).isoformat()}] Invalid task item type: {type(item)}, item: {item}, instance: {id(self)}")
+            self.log_update.emit(f"[API Scan] Failed: Invalid task item type: {type(item)}")
+            app_signals.update_file_list.emit("", f"Invalid task: {type(item)}", "unknown", 0, False)
+            return None
+
+        task_id = str(item.get('id', ''))
+        file_path = item.get('file_path', '')
+        if not file_path:
+            logger.error(f"[{datetime.now(timezone.utc).isoformat()}] Invalid task {task_id}: Missing file_path, item: {item}, instance: {id(self)}")
+            self.log_update.emit(f"[API Scan] Failed: Invalid task {task_id} - Missing file_path")
+            app_signals.update_file_list.emit("", f"Invalid task {task_id}: Missing file_path", "unknown", 0, False)
+            return None
+
+        file_name = item.get('file_name', Path(file_path).name)
+        action_type = item.get('request_type', '').lower()
+        task_key = f"{task_id}:{action_type}"
+        is_online = 'http' in file_path.lower()
+        local_path = str(BASE_TARGET_DIR / file_path.lstrip("/"))
+
+        # ✅ Prevent duplicate submissions
+        with self._lock:
+            if task_key in self.processed_tasks:
+                logger.debug(f"[{datetime.now(timezone.utc).isoformat()}] Skipping duplicate task: {task_key}, instance: {id(self)}")
+                self.log_update.emit(f"[API Scan] Skipped duplicate task: {task_key}")
+                return None
+            self.processed_tasks.add(task_key)  # Mark immediately as in-progress
+            entry = self._queue_entry(task_key)
+            if entry and entry["state"] == "done":
+                # Finished before a restart but the server missed the report; repeat it instead of the transfer
+                self.log_update.emit(f"[Queue] {task_key} already completed, reporting it again")
+                update_download_upload_metadata(task_id, "completed")
+                return None
+            self._set_queue_state(task_key, "queued", item)
+            update_download_upload_metadata(task_id, "in progress")
+
+        logger.debug(f"[{datetime.now(timezone.utc).isoformat()}] Submitting task: task_key={task_key}, task_id={task_id}, action_type={action_type}, file_path={file_path}, instance: {id(self)}")
+        self.log_update.emit(f"[API Scan] Submitting task: task_key={task_key}, task_id={task_id}, action_type={action_type}, file_path={file_path}")
+
+        try:
+            return self.transfer_scheduler.submit(
+                self._transfer_lane(item), self._transfer_priority(item),
+                self._process_task,
+                task_id, file_name, file_path, action_type, local_path, is_online, item, 3, self.transfer_limiter,
+                label=task_key
+            )
+        except Exception:
+            with self._lock:
+                self.processed_tasks.discard(task_key)
+            raise
+
+    def _collect_task_results(self, futures):
+        """Wait on submitted tasks (a Future -> task_key dict) in a background thread and report the outcome."""
+        completed_tasks = 0
+        failed_tasks = 0
+        updates = []
+        for future, task_key in futures.items():
+            try:
+                result = future.result()  # Wait for each task to complete
+                updates.append(result['update'])
+                if result['success']:
+                    completed_tasks += 1
+                    with self._lock:
+                        self.processed_tasks.add(result['task_key'])
+                else:
+                    failed_tasks += 1
+                    self._forget_task(result['task_key'])
+            except Exception as e:
+                logger.error(f"[{datetime.now(timezone.utc).isoformat()}] Task processing error: {str(e)}, instance: {id(self)}")
+                self.log_update.emit(f"[API Scan] Task processing error: {str(e)}")
+                failed_tasks += 1
+                self._forget_task(task_key)
+        if updates:
+            for update in updates:
+                app_signals.update_file_list.emit(*update)
+        logger.info(f"[{datetime.now(timezone.utc).isoformat()}] Background task summary: {completed_tasks} completed, {failed_tasks} failed, instance: {id(self)}")
+        self.log_update.emit(f"[FileWatcher] Background task summary: {completed_tasks} completed, {failed_tasks} failed")
+
+    def _set_queue_state(self, task_key, state, item=None, error=None):
+        # The durable queue is bookkeeping; a store error must not fail the transfer itself
+        try:
+            CACHE_STORE.set_queue_state(task_key, state, item=item, error=error)
+        except sqlite3.Error as e:
+            logger.error(f"[Queue] Could not record {task_key} as {state}: {e}")
+
+    def _queue_entry(self, task_key):
+        try:
+            return CACHE_STORE.get_queue_entry(task_key)
+        except sqlite3.Error as e:
+            logger.error(f"[Queue] Could not read {task_key}: {e}")
+            return None
+
+    def _resume_transfer_queue(self):
+        """Resubmit, or settle, transfers a previous run left unfinished in the durable queue.
+
+        Entries stuck in "verifying" whose file already landed are reported
+        completed; everything else goes back onto its lane, where resumable
+        transfers continue from their last checkpoint.
+        """
+        try:
+            CACHE_STORE.prune_transfer_queue(self.config["task_retention_hours"] * 3600)
+            entries = CACHE_STORE.queued_transfers()
+        except sqlite3.Error as e:
+            logger.error(f"[Queue] Could not read the transfer queue: {e}")
+            self.log_update.emit(f"[Queue] Could not read the transfer queue: {e}")
+            return
+        if not entries:
+            return
+        logger.info(f"[Queue] Resuming {len(entries)} unfinished transfer(s) from the last session")
+        self.log_update.emit(f"[Queue] Resuming {len(entries)} unfinished transfer(s) from the last session")
+        futures = {}  # Future -> task_key
+        for entry in entries:
+            task_key, item = entry["task_key"], entry["item"]
+            if not isinstance(item, dict):
+                self._set_queue_state(task_key, "failed", error="Task details were not recorded")
+                update_download_upload_metadata(entry["task_id"], "failed")
+                continue
+            if entry["state"] == "verifying" and self._transfer_landed(item):
+                self._set_queue_state(task_key, "done")
+                update_download_upload_metadata(entry["task_id"], "completed")
+                with self._lock:
+                    self.processed_tasks.add(task_key)
+                self.log_update.emit(f"[Queue] {task_key} had already finished transferring, reported completed")
+                continue
+            self.log_update.emit(f"[Queue] Resubmitting {task_key} (was {entry['state']}, {entry['attempts']} attempt(s))")
+            future = self._submit_task(item)
+            if future is not None:
+                futures[future] = task_key
+        if futures:
+            Thread(target=self._collect_task_results, args=(futures,), daemon=True).start()
+
+    def _transfer_landed(self, item):
+        """Whether the file of a finished-but-unconfirmed NAS transfer is in place at its destination."""
+        file_path = item.get("file_path", "")
+        if not file_path or 'http' in file_path.lower():
+            return False
+        local_path = BASE_TARGET_DIR / file_path.lstrip("/")
+        try:
+            if item.get("request_type", "").lower() == "download":
+                return local_path.exists()
+            with NAS_CONNECTION_POOL.connection() as conn:
+                return conn.sftp.stat(file_path).st_size == local_path.stat().st_size
+        except Exception as e:
+            logger.warning(f"[Queue] Could not verify {file_path}: {e}")
+            return False
+
     def _process_task(self, task_id, file_name, file_path, action_type, local_path, is_online, item, max_download_retries, sftp_semaphore):
         """Process a single task (download/upload) with retry logic and SFTP semaphore."""
         # update_download_upload_metadata(task_id, "in progress")
@@ -2687,20 +4447,146 @@ class FileWatcherWorker(QObject):
                 'success': False
             }
 
-    def check_connectivity(self):
+    @staticmethod
+    def _task_size(item):
+        """Size in bytes from ``file_size`` or else ``size``; 0 when neither holds a positive number."""
+        for field in ("file_size", "size"):
+            try:
+                value = int(item.get(field) or 0)
+            except (TypeError, ValueError):
+                continue
+            if value > 0:
+                return value
+        return 0
+
+    def _transfer_lane(self, item):
+        size = self._task_size(item)
+        if size:
+            return "large" if size >= self.config["large_file_threshold"] else "small"
+        return "large" if str(item.get("file_path", "")).lower().endswith(TRANSFER_LARGE_EXTENSIONS) else "small"
+
+    def _transfer_priority(self, item):
+        """Queue order for a task; lower tuples run first.
+
+        Sorted by explicit ``priority`` (higher values run first, default 0),
+        then earliest job due date, request type, then smallest size.
+        """
         try:
-            logger.debug(f"Checking API connectivity (attempt 1): {DOWNLOAD_UPLOAD_API}")
-            self.log_update.emit(f"[API Scan] Checking API connectivity (attempt 1): {DOWNLOAD_UPLOAD_API}")
-            response = HTTP_SESSION.get(f"{DOWNLOAD_UPLOAD_API}?user_id=200", verify=False, timeout=10)
-            app_signals.api_call_status.emit(DOWNLOAD_UPLOAD_API, f"Status: {response.status_code}, Response: {response.text[:500]}...", response.status_code)
-            self.log_update.emit(f"[API Scan] API Call: {DOWNLOAD_UPLOAD_API} | Status: Status: {response.status_code}, Response: {response.text[:500]}...")
-            response.raise_for_status()
-            self.log_update.emit("[API Scan] API connectivity check passed")
-            return True
-        except RequestException as e:
-            logger.error(f"API connectivity check failed: {str(e)}")
-            self.log_update.emit(f"[API Scan] API connectivity check failed: {str(e)}")
-            return False
+            explicit = -int(item.get("priority"))
+        except (TypeError, ValueError):
+            explicit = 0
+        due = float("inf")
+        for field in ("due_date", "job_due_date"):
+            value = item.get(field)
+            if not value:
+                continue
+            try:
+                due = float(value)
+            except (TypeError, ValueError):
+                try:
+                    due = datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+                except ValueError:
+                    continue
+            break
+        type_rank = TRANSFER_TYPE_PRIORITY.get(str(item.get("request_type", "")).lower(), 1)
+        return (explicit, due, type_rank, self._task_size(item))
+
+    @staticmethod
+    def _task_key(task):
+        return f"{task.get('id', '')}:{task.get('request_type', '').lower()}"
+
+    def _changed_tasks(self, tasks, delta=False):
+        """Return the tasks that are new or changed since the last fetch, and the fingerprints to remember.
+
+        A full list replaces the remembered fingerprints; a ``delta`` list
+        (fetched with a ``since`` cursor) only adds to them. Nothing is
+        stored here; _commit_task_list does that once the tasks are submitted.
+        """
+        fingerprints = {} if not delta else dict(self._task_fingerprints)
+        changed = []
+        for task in tasks:
+            if not isinstance(task, dict):
+                continue
+            task_key = self._task_key(task)
+            fingerprint = hashlib.sha1(json.dumps(task, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+            if self._task_fingerprints.get(task_key) != fingerprint:
+                changed.append(task)
+            fingerprints[task_key] = fingerprint
+        return changed, fingerprints
+
+    def _commit_task_list(self, validators, fingerprints, changed_keys, handled_keys):
+        """Remember a fetched task list once its tasks have been submitted.
+
+        Changed tasks that were neither submitted nor deliberately skipped
+        keep no fingerprint, so they count as changed next time. Tasks that
+        failed meanwhile are dropped too, and the ETag and cursor are then
+        not saved, so the next fetch is a full list that brings them back.
+        """
+        with self._lock:
+            forget = (changed_keys - handled_keys) | self._refetch_task_keys
+            self._task_fingerprints = {key: value for key, value in fingerprints.items() if key not in forget}
+            if not self._refetch_task_keys:
+                self._task_list_state.update(validators)
+            self._refetch_task_keys.clear()
+
+    def _forget_task(self, task_key):
+        """Make a failed task count as new again, and the next task list fetch a full one."""
+        with self._lock:
+            # Dedup covers tasks in flight or completed; a failed one is retried when listed again
+            self.processed_tasks.discard(task_key)
+            self._task_fingerprints.pop(task_key, None)
+            self._refetch_task_keys.add(task_key)
+            self._task_list_state.pop("etag", None)
+            self._task_list_state.pop("cursor", None)
+
+    def _machine_id(self):
+        if isinstance(USER_SYSTEM_INFO, dict):
+            return USER_SYSTEM_INFO.get("encoded_mac", "")
+        if isinstance(USER_SYSTEM_INFO, list) and USER_SYSTEM_INFO:
+            # if it's a list, use the first element that contains encoded_mac
+            first_entry = USER_SYSTEM_INFO[0]
+            return first_entry.get("encoded_mac", "") if isinstance(first_entry, dict) else ""
+        return ""
+
+    def _push_request(self):
+        """Query params and headers for the push channel (called from its thread)."""
+        user_id = get_cached('user_id', '')
+        token = get_cached('token', '')
+        if not user_id or not token or not self.running:
+            return None
+        return {"user_id": user_id, "machine_id": self._machine_id()}, {"Authorization": f"Bearer {token}"}
+
+    def _on_push_state(self, connected):
+        self.log_update.emit(f"[Push] Channel {'connected' if connected else 'disconnected'}, "
+                             f"polling every {self._current_poll_interval()/1000:.1f}s")
+
+    def _current_poll_interval(self):
+        """Poll interval in ms: a slow safety net while push is connected, adaptive otherwise."""
+        if self.push_client is not None and self.push_client.connected:
+            return self.config["push_fallback_poll_interval"]
+        return self.poll_scheduler.next_delay()
+
+    def _schedule_next_poll(self):
+        poll_interval = self._current_poll_interval()
+        self.api_poll_interval = poll_interval
+        self.next_api_hit_time = datetime.now(timezone.utc) + timedelta(milliseconds=poll_interval)
+        mode = "push" if self.push_client is not None and self.push_client.connected else self.poll_scheduler.state
+        last_hit = self.last_api_hit_time.strftime('%Y-%m-%d %H:%M:%S %Z') if self.last_api_hit_time else "never"
+        app_signals.update_timer_status.emit(
+            f"Last API hit: {last_hit} | "
+            f"Next API hit: {self.next_api_hit_time.strftime('%Y-%m-%d %H:%M:%S %Z')} | "
+            f"Interval: {poll_interval/1000:.1f}s ({mode})"
+        )
+
+    @Slot(str, str)
+    def _on_push_event(self, event, data):
+        """Fetch the task list right away when the server announces a change."""
+        logger.debug(f"[Push] Event received: {event}")
+        self.log_update.emit(f"[Push] Event received: {event}")
+        if not self.running:
+            return
+        self.next_api_hit_time = None
+        self.run()
 
     def show_progress(self, message, src_path, dest_path, action_type, item, is_nas_src, is_nas_dest):
         task_id = str(item.get('id', ''))
@@ -2720,14 +4606,15 @@ class FileWatcherWorker(QObject):
         raise NotImplementedError("HTTP upload not implemented")
 
     def _clean_processed_tasks(self):
-        current_time = time.time()
-        retention_seconds = self.config["task_retention_hours"] * 3600
-        self.processed_tasks = {task for task in self.processed_tasks if (current_time - float(task.split(":")[0])) < retention_seconds}
-        if len(self.processed_tasks) > self.config["max_processed_tasks"]:
-            self.processed_tasks = set(list(self.processed_tasks)[-self.config["max_processed_tasks"]:])
+        remaining = self.processed_tasks.prune()
+        logger.debug(f"[{datetime.now(timezone.utc).isoformat()}] {remaining} processed task(s) retained, instance: {id(self)}")
 
     def cleanup(self):
         self.running = False
+        if self.push_client is not None:
+            self.push_client.stop()
+        if hasattr(self, 'transfer_scheduler'):
+            self.transfer_scheduler.shutdown()
         logger.info("FileWatcherWorker cleaned up")
         self.log_update.emit("[FileWatcher] Cleaned up")
 
@@ -2736,6 +4623,8 @@ class FileWatcherWorker(QObject):
         self.running = False
         if self.timer.isActive():
             self.timer.stop()
+        if self.push_client is not None:
+            self.push_client.stop()
         logger.debug(f"[{datetime.now(timezone.utc).isoformat()}] FileWatcherWorker stopped")
 
 
@@ -2952,7 +4841,7 @@ class ThumbnailLoader(QRunnable):
                 pixmap.load(self.url)
             # Remote URL
             elif self.url.startswith("http"):
-                response = requests.get(self.url, timeout=3)
+                response = HTTP_SESSION.get(self.url, timeout=3)
                 if response.status_code == 200:
                     pixmap.loadFromData(response.content)
         except Exception:
@@ -2965,6 +4854,22 @@ class ThumbnailLoader(QRunnable):
 
 
 
+def show_transfer_progress(table, file_path, status, progress):
+    """Show live transfer progress on the row of a file list table for ``file_path``, if it is listed."""
+    for row in range(table.rowCount()):
+        if table.item(row, 3) and table.item(row, 3).text() == Path(file_path).name:
+            table.setItem(row, 7, QTableWidgetItem(status))
+            progress_bar = table.cellWidget(row, 4)
+            if not isinstance(progress_bar, QProgressBar):
+                progress_bar = QProgressBar(table)
+                progress_bar.setMinimum(0)
+                progress_bar.setMaximum(100)
+                progress_bar.setFixedHeight(20)
+                table.setCellWidget(row, 4, progress_bar)
+            progress_bar.setValue(progress)
+            return
+
+
 class FileDownloadListWindow(QDialog):
     def __init__(self, file_type, parent=None):
         super().__init__(parent)
@@ -3335,6 +5240,10 @@ class FileDownloadListWindow(QDialog):
     def refresh_files(self, file_path, status, action_type, progress, is_nas_src):
         """Refresh the file list if the action_type matches file_type."""
         try:
+            if 0 < progress < 100 and self.file_type.startswith(action_type):
+                # In-flight byte progress: update the row in place instead of reloading
+                show_transfer_progress(self.table, file_path, status, progress)
+                return
             if action_type == self.file_type:
                 logger.debug(f"Refreshing files for {self.file_type} due to update: {file_path}, status: {status}, progress: {progress}")
                 self._load_files_with_logging()
@@ -4162,6 +6071,10 @@ class FileUploadListWindow(QDialog):
     def refresh_files(self, file_path, status, action_type, progress, is_nas_src):
         """Refresh the file list if the action_type matches file_type."""
         try:
+            if 0 < progress < 100 and self.file_type.startswith(action_type):
+                # In-flight byte progress: update the row in place instead of reloading
+                show_transfer_progress(self.table, file_path, status, progress)
+                return
             if action_type == self.file_type:
                 logger.debug(f"Refreshing files for {self.file_type} due to update: {file_path}, status: {status}, progress: {progress}")
                 self._load_files_with_logging()
@@ -5270,7 +7183,7 @@ class PremediaApp(QApplication):
             super().__init__(sys.argv)
             self.setQuitOnLastWindowClosed(False)
             self.setWindowIcon(load_icon(ICON_PATH, "application"))
-            self.CACHE_FILE = CACHE_FILE
+            self.CACHE_FILE = CACHE_DB_FILE
             # Prevent multiple instances using a lock file
             self.lock_file = os.path.join(tempfile.gettempdir(), "premedia_app.lock")
             try:
@@ -5422,7 +7335,6 @@ class PremediaApp(QApplication):
                         info_resp = HTTP_SESSION.get(
                             f"{BASE_DOMAIN}/api/user/getinfo?emailid={cache.get('user')}",
                             headers={"Authorization": f"Bearer {cache.get('token')}"},
-                            verify=False,
                             timeout=30
                         )
                         app_signals.api_call_status.emit(
@@ -5560,11 +7472,8 @@ class PremediaApp(QApplication):
             # Load user full name (with fallback) from cache if logged in
             if self.logged_in:
                 try:
-                    cache_file = Path(self.CACHE_FILE).resolve()
-                    if cache_file.exists() and cache_file.is_file():
-                        with cache_file.open('r', encoding='utf-8') as f:
-                            cache_data = json.load(f)
-
+                    cache_data = load_cache()
+                    if cache_data:
                         user_data = cache_data.get('user_data', {}).get('data', [])
                         if user_data and isinstance(user_data, list):
                             attributes = user_data[0].get('attributes', {})
@@ -5587,8 +7496,8 @@ class PremediaApp(QApplication):
                             logger.warning("Cache user_data missing or not a list")
                             user_fullname = "Unknown"
                     else:
-                        logger.warning(f"Cache file missing or invalid: {cache_file}")
-                        app_signals.append_log.emit(f"[Tray] Cache file missing: {cache_file}")
+                        logger.warning(f"Cache store empty or invalid: {self.CACHE_FILE}")
+                        app_signals.append_log.emit(f"[Tray] Cache store empty: {self.CACHE_FILE}")
                         user_fullname = "Unknown"
                 except (json.JSONDecodeError, IOError) as e:
                     logger.error(f"Failed to read fullname from cache: {e}")
@@ -5763,6 +7672,7 @@ class PremediaApp(QApplication):
 
         worker = getattr(self, 'file_watcher', None)
         if worker is not None:
+            worker.cleanup()  # Stops the push channel thread
             self.file_watcher = None  # Let Python GC handle it
 
         timer = getattr(self, 'poll_timer', None)
@@ -5899,7 +7809,7 @@ class PremediaApp(QApplication):
             self.poll_timer.timeout.connect(
                 lambda: QMetaObject.invokeMethod(self.file_watcher, "run", Qt.QueuedConnection)
             )
-            self.poll_timer.start(3000)  # 3 sec
+            self.poll_timer.start(API_POLL_INTERVAL)  # run() gates each tick by the adaptive interval
 
             # Watchdog
             self.watchdog_timer = QTimer(self)
@@ -6048,10 +7958,16 @@ class PremediaApp(QApplication):
                 self.tray_icon.hide()
                 self.tray_icon.deleteLater()
 
+            STATUS_REPORTER.stop()
+            CONVERSION_SERVICE.shutdown()
+
             # Close HTTP session
             logger.debug("Closing HTTP_SESSION")
             app_signals.append_log.emit("[App] Closing HTTP_SESSION")
             HTTP_SESSION.close()
+            NAS_CONNECTION_POOL.close_all()
+            flush_cache()
+            CACHE_STORE.close()
 
             # Stop logging
             stop_logging()
@@ -6079,7 +7995,7 @@ class PremediaApp(QApplication):
                 'user_id': user_id,
                 'machine_id': machine_id,
             }
-            response = requests.post(API_URL_LOGOUT, data=payload, verify=False)
+            response = api_request("POST", API_URL_LOGOUT, data=payload)
             logger.info(response)
             if response.status_code == 200:
                 logger.info(f"Successfully posted metadata to API (Logout).")
@@ -6189,7 +8105,7 @@ class PremediaApp(QApplication):
             logger.debug(f"Attempting to open cache file: {cache_file}")
             app_signals.append_log.emit(f"[Cache] Attempting to open: {cache_file}")
 
-            # Check if file exists
+            # Check if store exists
             if not cache_file.exists():
                 logger.warning(f"Cache file does not exist: {cache_file}")
                 app_signals.append_log.emit(f"[Cache] Cache file does not exist: {cache_file}")
@@ -6197,33 +8113,10 @@ class PremediaApp(QApplication):
                 QMessageBox.warning(None, "Cache Error", f"Cache file does not exist:\n{cache_file}")
                 return
 
-            # Verify file is readable
-            if not cache_file.is_file():
-                logger.warning(f"Cache file is not a valid file: {cache_file}")
-                app_signals.append_log.emit(f"[Cache] Invalid file: {cache_file}")
-                app_signals.update_status.emit("Invalid cache file")
-                QMessageBox.warning(None, "Cache Error", f"Invalid cache file:\n{cache_file}")
-                return
-
-            # Read and beautify file content
-            try:
-                with cache_file.open('r', encoding='utf-8') as f:
-                    raw_content = f.read()
-                # Try to parse and beautify JSON
-                try:
-                    json_data = json.loads(raw_content)
-                    content = json.dumps(json_data, indent=4, sort_keys=True)
-                    logger.debug("Successfully parsed and formatted JSON content")
-                    app_signals.append_log.emit("[Cache] Successfully formatted JSON content")
-                except json.JSONDecodeError as json_err:
-                    logger.warning(f"Cache file is not valid JSON: {json_err}")
-                    app_signals.append_log.emit(f"[Cache] Not valid JSON, displaying raw content: {str(json_err)}")
-                    content = raw_content  # Fall back to raw content
-            except UnicodeDecodeError:
-                logger.warning(f"Cache file is not UTF-8 encoded: {cache_file}")
-                app_signals.append_log.emit(f"[Cache] Non-UTF-8 file detected: {cache_file}")
-                with cache_file.open('r', encoding='latin-1') as f:
-                    content = f.read()  # Display raw content without JSON formatting
+            # Render the store contents as formatted JSON
+            content = json.dumps(load_cache(), indent=4, sort_keys=True, default=str)
+            logger.debug("Successfully formatted cache store content")
+            app_signals.append_log.emit("[Cache] Successfully formatted cache content")
 
             # Create and show dialog
             dialog = QDialog(None)  # Use None as parent since PremediaApp is not a widget
@@ -6282,6 +8175,8 @@ class PremediaApp(QApplication):
                 GLOBAL_CACHE = None
                 self.logged_in = False
                 self.update_tray_menu()
+                # Release the SQLite handle so the store file can be deleted below
+                CACHE_STORE.close()
 
                 # Delete everything inside BASE_TARGET_DIR
                 if os.path.exists(BASE_TARGET_DIR):
@@ -6350,8 +8245,13 @@ class PremediaApp(QApplication):
                 logger.debug("Hiding tray_icon")
                 self.tray_icon.hide()
 
+            STATUS_REPORTER.stop()
+            CONVERSION_SERVICE.shutdown()
             logger.debug("Closing HTTP_SESSION")
             HTTP_SESSION.close()
+            NAS_CONNECTION_POOL.close_all()
+            flush_cache()
+            CACHE_STORE.close()
 
             stop_logging()
             app_signals.update_status.emit("Application quitting")
@@ -0,0 +1,115 @@
+# bench_tiff_conversion.py
+"""Benchmark TIFF to 8-bit RGB conversion on 16-bit CMYK files.
+
+Compares the strip-wise conversion used by the app (tiff_page_to_image)
+with the previous whole-array approach: ``astype(np.uint8)`` on the full
+page, then a CMYK to RGB round trip through Pillow.
+
+    python bench_tiff_conversion.py                 # synthetic 16-bit CMYK files
+    python bench_tiff_conversion.py a.tif b.tif     # your own files
+    python bench_tiff_conversion.py --icc USWebCoatedSWOP.icc --size 8000x6000
+
+Reports wall time and the peak RSS each conversion adds, sampled in a
+fresh process per run.
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import psutil
+import tifffile
+from PIL import Image
+
+import image_convert
+
+
+def legacy_convert(page):
+    """The conversion the TIFF branch did before tiff_page_to_image."""
+    arr = page.asarray()
+    if "S" in page.axes:
+        arr = np.moveaxis(arr, page.axes.index("S"), -1)
+    arr = np.ascontiguousarray(arr.astype(np.uint8))
+    return Image.frombytes("CMYK", (arr.shape[1], arr.shape[0]), arr[..., :4].tobytes()).convert("RGB")
+
+
+def run_once(method, path):
+    """Convert ``path`` once in this (fresh) process, sampling RSS from a thread meanwhile."""
+    convert = legacy_convert if method == "legacy" else (lambda page: image_convert.tiff_page_to_image(page, path))
+    process = psutil.Process()
+    baseline = process.memory_info().rss
+    peak = [baseline]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(0.005):
+            peak[0] = max(peak[0], process.memory_info().rss)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    with tifffile.TiffFile(path) as tif:
+        convert(tif.pages[0])
+    elapsed = time.perf_counter() - start
+    done.set()
+    sampler.join()
+    return elapsed, peak[0] - baseline
+
+
+def measure(method, path):
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(run_once, method, path).result()
+
+
+def make_samples(directory, width, height, icc_profile):
+    """Write representative 16-bit CMYK files: interleaved, planar and compressed."""
+    rng = np.random.default_rng(0)
+    # Smooth gradients with noise, closer to scanned artwork than pure noise
+    ramp = np.linspace(0, 65535, width, dtype=np.float32)
+    data = np.empty((height, width, 4), dtype=np.uint16)
+    for channel in range(4):
+        noise = rng.integers(0, 2048, (height, width), dtype=np.uint16)
+        data[..., channel] = np.roll(ramp, channel * width // 4).astype(np.uint16) // 2 + noise
+    variants = {
+        "cmyk16_contig.tif": dict(planarconfig="contig"),
+        "cmyk16_planar.tif": dict(planarconfig="separate"),
+        "cmyk16_zlib.tif": dict(planarconfig="contig", compression="zlib", tile=(512, 512)),
+    }
+    paths = []
+    for name, options in variants.items():
+        path = os.path.join(directory, name)
+        samples = np.moveaxis(data, -1, 0) if options["planarconfig"] == "separate" else data
+        tifffile.imwrite(path, samples, photometric="separated", iccprofile=icc_profile, **options)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", help="TIFF files to convert (default: generated samples)")
+    parser.add_argument("--size", default="6000x4000", help="WIDTHxHEIGHT of generated samples")
+    parser.add_argument("--icc", help="CMYK ICC profile to embed in generated samples")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per file; the fastest is reported")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = args.files
+        if not paths:
+            width, height = (int(v) for v in args.size.lower().split("x"))
+            icc_profile = open(args.icc, "rb").read() if args.icc else None
+            paths = make_samples(directory, width, height, icc_profile)
+
+        print(f"{'file':<24}{'method':<10}{'seconds':>10}{'peak MiB':>12}")
+        for path in paths:
+            for method in ("legacy", "strips"):
+                runs = [measure(method, path) for _ in range(args.repeat)]
+                elapsed, peak = min(runs)
+                print(f"{os.path.basename(path):<24}{method:<10}{elapsed:>10.2f}{peak / 2**20:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
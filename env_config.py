@@ -0,0 +1,32 @@
+# env_config.py
+"""Numeric settings read from PREMEDIA_* environment variables.
+
+A bad value is logged and replaced by the default rather than raising, so a
+typo in the environment cannot stop the app (or a conversion worker, which
+imports this without app.py) from starting.
+"""
+import logging
+import os
+
+logger = logging.getLogger("PremediaApp")
+
+
+def _env_number(name, default, cast):
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        logger.warning(f"Ignoring {name}={value!r}: not a valid {cast.__name__}, using {default}")
+        return default
+
+
+def env_int(name, default):
+    """Integer from environment variable ``name``; ``default`` if unset, empty or invalid."""
+    return _env_number(name, default, int)
+
+
+def env_float(name, default):
+    """Float from environment variable ``name``; ``default`` if unset, empty or invalid."""
+    return _env_number(name, default, float)
@@ -0,0 +1,434 @@
+# image_convert.py
+"""Image conversion to JPEG for previews, QC and finals.
+
+Kept apart from app.py so the conversion worker processes, which are
+started with "spawn" and import their entry point afresh, load only the
+decoders: importing this module has no side effects (no Qt, logging
+handlers, HTTP client or caches).
+"""
+import io
+import logging
+import os
+import re
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageSequence
+
+from env_config import env_int
+
+try:
+    from psd_tools import PSDImage
+except ImportError:
+    PSDImage = None
+try:
+    import rawpy
+except ImportError:
+    rawpy = None
+try:
+    import tifffile
+except ImportError:
+    tifffile = None
+try:
+    from PIL import ImageCms
+except ImportError:
+    ImageCms = None  # Pillow built without LittleCMS; CMYK falls back to the naive conversion
+try:
+    import imagecodecs  # noqa: F401 -- LZW/JPEG/zstd codecs for tifffile
+except ImportError:
+    imagecodecs = None
+
+logger = logging.getLogger("PremediaApp")
+
+SUPPORTED_EXTENSIONS = [
+    "jpg", "jpeg", "png", "gif", "tiff", "tif", "bmp", "webp",
+    "psd", "psb", "cr2", "nef", "arw", "dng", "raf", "pef", "srw"
+]
+TIFF_STRIP_BYTES = 4 * 1024 * 1024  # decoded TIFF samples scaled to 8-bit per strip of rows
+TIFF_MEMMAP_BYTES = 512 * 1024 * 1024  # TIFF pages larger than this are decoded to a memory map, not RAM
+# How each kind of conversion job flattens PSD/PSB: "thumbnail", "merged" or "composite" (see render_psd)
+PSD_RENDER_MODE_BY_JOB = {
+    "thumbnail": "thumbnail",
+    "preview": os.getenv("PREMEDIA_PSD_PREVIEW_MODE", "merged"),
+    "qc": "merged",
+    "final": "composite",
+}
+# Longest edge in pixels each kind of conversion job is decoded and saved at; None keeps full resolution
+CONVERSION_MAX_SIZE_BY_JOB = {
+    "thumbnail": 512,
+    "preview": env_int("PREMEDIA_PREVIEW_MAX_SIZE", 2048) or None,
+    "qc": 2048,
+    "final": None,
+}
+
+
+def sanitize_filename(filename):
+    return re.sub(r'[^\w\-.]', '_', filename)
+
+
+def render_psd(psd, mode, full_file_path):
+    """Flatten an opened PSD/PSB for conversion, as cheaply as ``mode`` allows.
+
+    "thumbnail" uses the embedded thumbnail resource, "merged" the flattened
+    image Photoshop saved alongside the layers (Maximize Compatibility), and
+    "composite" re-renders every layer. The cheaper modes fall through to the
+    next one when the file does not carry the data they need.
+    """
+    if mode == "thumbnail" and psd.has_thumbnail():
+        image = psd.thumbnail()
+        if image is not None:
+            logger.info(f"PSD embedded thumbnail used for {full_file_path}")
+            return image
+    if mode in ("thumbnail", "merged") and psd.has_preview():
+        image = psd.topil()
+        if image is not None:
+            logger.info(f"PSD merged image data used for {full_file_path}")
+            return image
+    if mode != "composite":
+        logger.info(f"PSD has no merged image data, compositing layers: {full_file_path}")
+    return psd.composite()
+
+
+def select_tiff_level(tif, max_size):
+    """Return the first page of the smallest pyramid level still at least ``max_size`` on its long edge.
+
+    Tiled pyramids store their reduced-resolution copies as SubIFDs or as
+    reduced-resolution pages, which tifffile exposes as levels of the first
+    series. Without a ``max_size``, or without levels, this is the full page.
+    """
+    page = tif.pages[0]
+    if not max_size or not tif.series:
+        return page
+    for level in tif.series[0].levels[1:]:
+        keyframe = level.keyframe
+        if max(keyframe.imagewidth, keyframe.imagelength) < max_size:
+            break
+        page = keyframe
+    return page
+
+
+def scale_to_uint8(src, dst, bits=None):
+    """Scale a block of samples into the uint8 array ``dst`` of the same shape.
+
+    Integers keep their top 8 significant bits (``bits`` is the stored depth,
+    e.g. 12 for 12-bit data held in uint16), signed integers are offset to
+    unsigned first, floats are read as 0.0-1.0 and booleans as 0/1. Signed
+    and float input need one temporary the size of ``src``; the rest is
+    computed straight into ``dst``.
+    """
+    kind = src.dtype.kind
+    if kind == "b":
+        np.multiply(src, 255, out=dst, casting="unsafe")
+    elif kind == "f":
+        tmp = np.multiply(src, 255.0, dtype=np.float32)
+        np.clip(tmp, 0, 255, out=tmp)
+        np.add(tmp, 0.5, out=tmp)
+        np.copyto(dst, tmp, casting="unsafe")
+    else:
+        width = src.dtype.itemsize * 8
+        bits = min(bits or width, width)
+        if kind == "i":
+            unsigned = np.dtype(f"u{src.dtype.itemsize}")
+            src = np.bitwise_xor(src.view(unsigned), unsigned.type(1 << (width - 1)))
+            bits = width
+        if bits > 8:
+            np.right_shift(src, bits - 8, out=dst, casting="unsafe")
+        elif bits < 8:
+            # 1, 2 and 4-bit samples: 255 is an exact multiple of their maximum
+            np.multiply(src, 255 // ((1 << bits) - 1), out=dst, casting="unsafe")
+        else:
+            np.copyto(dst, src, casting="unsafe")
+
+
+def cmyk_to_rgb(cmyk, transform=None):
+    """Convert a (rows, width, 4) uint8 CMYK block to an RGB PIL image.
+
+    With an ImageCms ``transform`` built from the file's ICC profile the
+    conversion is colour managed, otherwise it is Pillow's device formula.
+    Both run in C over the block, which beats the equivalent NumPy passes.
+    """
+    rows, width = cmyk.shape[:2]
+    block = Image.frombytes("CMYK", (width, rows), cmyk)
+    return ImageCms.applyTransform(block, transform) if transform is not None else block.convert("RGB")
+
+
+def build_cmyk_transform(icc_profile, full_file_path):
+    """Return an ImageCms CMYK to sRGB transform for an embedded profile, or None."""
+    if not icc_profile or ImageCms is None:
+        return None
+    try:
+        return ImageCms.buildTransform(
+            ImageCms.ImageCmsProfile(io.BytesIO(icc_profile)), ImageCms.createProfile("sRGB"), "CMYK", "RGB"
+        )
+    except (ImageCms.PyCMSError, OSError) as e:
+        logger.warning(f"Ignoring unusable CMYK ICC profile in {full_file_path}: {e}")
+        return None
+
+
+def tiff_page_to_image(page, full_file_path):
+    """Convert a TIFF page to an 8-bit RGB or L PIL image, or None if unsupported.
+
+    Samples are scaled to 8-bit a strip of rows at a time and pasted into
+    the output image, so besides the decoded page only the 8-bit result and
+    one strip are held. Uncompressed pages are read through a memory map of
+    the file, and compressed pages over TIFF_MEMMAP_BYTES are decoded to
+    one. Extra samples such as alpha are dropped, as for other formats
+    saved to JPEG.
+    """
+    photometric = getattr(page.photometric, 'name', 'unknown').lower()
+    if page.is_memmappable or page.nbytes > TIFF_MEMMAP_BYTES:
+        arr = page.asarray(out="memmap")  # uncompressed pages map the file itself
+    else:
+        arr = page.asarray()
+    axes = page.axes
+    if "S" in axes:
+        arr = np.moveaxis(arr, axes.index("S"), -1)
+    while arr.ndim > (3 if "S" in axes else 2):
+        arr = arr[0]  # first plane of volumetric pages
+    samples = arr.shape[2] if arr.ndim == 3 else 1
+    height, width = arr.shape[:2]
+    bits = page.bitspersample
+
+    transform = None
+    lut = None
+    if photometric in ['rgb', 'ycbcr'] and samples >= 3:
+        src, shape = arr[..., :3], (width, 3)
+    elif photometric == 'separated' and samples >= 4:
+        src, shape = arr[..., :4], (width, 4)
+        transform = build_cmyk_transform(page.iccprofile, full_file_path)
+    elif photometric == 'palette' and page.colormap is not None:
+        src, shape = (arr[..., 0] if arr.ndim == 3 else arr), (width, 3)
+        colormap = page.colormap
+        lut = (colormap >> 8 if colormap.max() > 255 else colormap).astype(np.uint8).T
+    elif photometric in ['minisblack', 'miniswhite'] or arr.ndim == 2:
+        src, shape = (arr[..., 0] if arr.ndim == 3 else arr), (width,)
+    else:
+        logger.warning(f"Unsupported TIFF photometric: {photometric}, samples: {samples}")
+        return None
+
+    pil_image = Image.new("L" if len(shape) == 1 else "RGB", (width, height))
+    rows = max(1, TIFF_STRIP_BYTES // max(1, src[:1].nbytes))
+    strip = np.empty((min(rows, height),) + shape, dtype=np.uint8)
+    for y in range(0, height, rows):
+        block = src[y:y + rows]
+        n = block.shape[0]
+        if lut is not None:
+            np.take(lut, block, axis=0, out=strip[:n], mode="clip")
+        else:
+            scale_to_uint8(block, strip[:n], bits)
+        if photometric == 'separated':
+            pil_image.paste(cmyk_to_rgb(strip[:n], transform), (0, y))
+            continue
+        if photometric == 'miniswhite':
+            np.invert(strip[:n], out=strip[:n])
+        pil_image.paste(Image.fromarray(strip[:n]), (0, y))
+
+    if pil_image.mode == "RGB" and photometric != 'separated' and page.iccprofile:
+        pil_image.info["icc_profile"] = page.iccprofile
+    logger.info(f"Processed TIFF, mode: {pil_image.mode}, photometric: {photometric}, "
+                f"dtype: {arr.dtype}, ICC transform: {transform is not None}")
+    return pil_image
+
+
+# LibRaw orientation codes (sizes.flip) as the PIL transpose that applies them
+RAW_FLIP_TRANSPOSE = {3: Image.ROTATE_180, 5: Image.ROTATE_90, 6: Image.ROTATE_270}
+
+
+def decode_raw(raw, max_size, full_file_path):
+    """Develop an opened raw file, no larger than ``max_size`` needs.
+
+    The camera's embedded JPEG preview is used when it is big enough,
+    otherwise LibRaw demosaics at half size when that still covers
+    ``max_size``; only full-size targets pay for a full demosaic.
+    """
+    if max_size:
+        try:
+            thumb = raw.extract_thumb()
+        except (rawpy.LibRawNoThumbnailError, rawpy.LibRawUnsupportedThumbnailError):
+            thumb = None
+        if thumb is not None:
+            if thumb.format == rawpy.ThumbFormat.JPEG:
+                image = Image.open(io.BytesIO(thumb.data))
+                image.draft("RGB", (max_size, max_size))
+            else:
+                image = Image.fromarray(thumb.data)
+            # postprocess() applies the camera orientation itself; the preview is stored unrotated
+            transpose = RAW_FLIP_TRANSPOSE.get(raw.sizes.flip)
+            if transpose is not None:
+                image = image.transpose(transpose)
+            if max(image.size) >= max_size:
+                logger.info(f"Raw embedded preview used for {full_file_path}, size: {image.size}")
+                return image
+        half_size = max(raw.sizes.width, raw.sizes.height) // 2 >= max_size
+    else:
+        half_size = False
+    return Image.fromarray(raw.postprocess(half_size=half_size))
+
+
+def process_image_in_memory(image_data, ext, full_file_path, psd_mode="merged", max_size=None):
+    """Decode an image and return it re-encoded as JPEG in a BytesIO, or None.
+
+    ``image_data`` is the encoded bytes or, to keep large containers out of
+    memory, a seekable binary file handle that the decoders read from on
+    demand; raw files are then handed to LibRaw by path. ``psd_mode`` picks
+    how PSD/PSB files are flattened, see render_psd. ``max_size`` caps the
+    long edge of the output; decoders that can work at reduced resolution
+    (JPEG DCT scaling, raw previews/half size, TIFF pyramids) do so.
+    """
+    if isinstance(image_data, (bytes, bytearray, memoryview)):
+        stream = io.BytesIO(image_data)
+    else:
+        stream = image_data
+    pil_image = None
+    ext = ext.lower()
+    logger.info(f"Starting processing of {full_file_path} with extension {ext}")
+
+    if ext in ['jpg', 'jpeg', 'png']:
+        pil_image = Image.open(stream)
+        if max_size:
+            # Lets libjpeg decode at 1/2, 1/4 or 1/8 scale; a no-op for PNG
+            pil_image.draft("RGB", (max_size, max_size))
+        logger.info(f"Opened {ext} file, mode: {pil_image.mode}")
+    elif ext == 'gif':
+        pil_image = Image.open(stream)
+        pil_image = next(ImageSequence.Iterator(pil_image))
+        logger.info("Processed GIF first frame, mode: {pil_image.mode}")
+    elif ext in ['tif', 'tiff']:
+        with tifffile.TiffFile(stream) as tif:
+            page = select_tiff_level(tif, max_size)
+            pil_image = tiff_page_to_image(page, full_file_path)
+            if pil_image is None:
+                return None
+    elif ext in ['psd', 'psb']:
+            psd = PSDImage.open(stream)
+            if psd is None:
+                logger.error(f"PSD could not be opened: {full_file_path}")
+                return None
+
+            pil_image = render_psd(psd, psd_mode, full_file_path)
+            logger.info(f"PSD render result, mode: {pil_image.mode}, size: {pil_image.size}")
+
+            # Apply ICC profile if available
+            try:
+                icc = psd.image_resources.get("icc_profile")
+                if icc:
+                    pil_image.info["icc_profile"] = icc.data
+                    logger.info(f"Applied ICC profile to PSD: {full_file_path}")
+            except Exception as e:
+                logger.warning(f"Error extracting ICC profile: {e}")
+    elif ext in ['cr2', 'nef', 'arw', 'dng', 'raf', 'pef', 'srw']:
+        # rawpy would read a file object fully into memory; LibRaw streams from the path itself
+        with rawpy.imread(getattr(stream, "name", stream)) as raw:
+            pil_image = decode_raw(raw, max_size, full_file_path)
+        logger.info(f"Processed raw image, mode: {pil_image.mode}, size: {pil_image.size}")
+    else:
+        pil_image = Image.open(stream)
+        logger.info(f"Opened {ext} file, mode: {pil_image.mode}")
+
+    if pil_image is None:
+        logger.error(f"Failed to create PIL image for {full_file_path}")
+        return None
+
+    if max_size and max(pil_image.size) > max_size:
+        pil_image.thumbnail((max_size, max_size), Image.LANCZOS)
+        logger.info(f"Reduced to {pil_image.size} for max size {max_size}")
+
+    if pil_image.mode != "RGB":
+        pil_image = pil_image.convert("RGB")
+        logger.info("Final conversion to RGB, size: {pil_image.size}")
+
+    jpeg_buffer = io.BytesIO()
+    logger.info(f"Attempting to save JPEG to buffer, initial position: {jpeg_buffer.tell()}")
+    pil_image.save(jpeg_buffer, format="JPEG", quality=80, icc_profile=pil_image.info.get('icc_profile'))
+    logger.info(f"JPEG save completed, buffer position: {jpeg_buffer.tell()}")
+    jpeg_buffer.seek(0)
+    buffer_size = jpeg_buffer.getbuffer().nbytes
+    logger.info(f"Buffer byte count: {buffer_size}")
+    if buffer_size == 0:
+        logger.error(f"Empty JPEG buffer for {full_file_path} after save")
+        return None
+    jpeg_buffer.seek(0)
+    return jpeg_buffer
+ 
+
+
+
+
+
+
+def process_single_file(full_file_path, job_type="preview"):
+    """Convert a single file to JPEG and move original to backup.
+
+    ``job_type`` selects the PSD/PSB render mode from PSD_RENDER_MODE_BY_JOB
+    and the output size from CONVERSION_MAX_SIZE_BY_JOB.
+    """
+    path = Path(full_file_path)
+    if not path.is_file():
+        logger.error(f"File does not exist: {full_file_path}")
+        return None, None
+
+    base_directory = path.parent
+    original_file_name = path.name
+    file_name = sanitize_filename(original_file_name)
+    ext = path.suffix.lower().lstrip(".")
+
+    if ext not in SUPPORTED_EXTENSIONS:
+        logger.debug(f"Unsupported file extension: {ext}")
+        error_dir = base_directory / "invalid_files"
+        error_dir.mkdir(exist_ok=True)
+        error_path = error_dir / original_file_name
+        path.rename(error_path)
+        logger.warning(f"File moved to invalid folder: {error_path}")
+        return None, None
+
+    output_file_name = ".".join(file_name.split(".")[:-1]) + ".jpg"
+    local_output_path = base_directory / output_file_name
+
+    if local_output_path.exists():
+        logger.info(f"Skipping: Output JPEG exists: {local_output_path}")
+        return str(local_output_path), str(path)
+
+    if ext in ["jpg", "jpeg"]:
+        sanitized_path = base_directory / file_name
+        if path != sanitized_path:
+            path.rename(sanitized_path)
+        logger.debug(f"JPEG moved/renamed to {sanitized_path}")
+        return str(sanitized_path), str(sanitized_path)
+
+    start_time = time.time()
+    # Decoders read from the open file as they need it, so a multi-GB PSB/TIFF is never held whole in RAM;
+    # the handle is closed again before the original is renamed below
+    with open(path, "rb") as f:
+        psd_mode = PSD_RENDER_MODE_BY_JOB.get(job_type, PSD_RENDER_MODE_BY_JOB["preview"])
+        max_size = CONVERSION_MAX_SIZE_BY_JOB.get(job_type, CONVERSION_MAX_SIZE_BY_JOB["preview"])
+        jpeg_buffer = process_image_in_memory(f, ext, str(path), psd_mode=psd_mode, max_size=max_size)
+    elapsed = time.time() - start_time
+    logger.info(f"Conversion time: {elapsed:.2f} seconds")
+
+    if jpeg_buffer is None:
+        error_dir = base_directory / "invalid_files"
+        error_dir.mkdir(exist_ok=True)
+        error_path = error_dir / original_file_name
+        path.rename(error_path)
+        logger.warning(f"File moved to invalid folder: {error_path}")
+        return None, None
+
+    if local_output_path.exists():
+        local_output_path.unlink()
+
+    with open(local_output_path, "wb") as f:
+        f.write(jpeg_buffer.getvalue())
+    os.chmod(local_output_path, 0o777)
+    logger.debug(f"Converted JPEG written to {local_output_path}")
+
+    backup_path = base_directory / original_file_name
+    path.rename(backup_path)
+    logger.debug(f"Original file renamed to {backup_path}")
+
+    return str(local_output_path), str(full_file_path)
+
+
+def convert_file_job(full_file_path, job_type):
+    """Process pool entry point; spawned workers import only this module to run it."""
+    return process_single_file(full_file_path, job_type)